@@ -3,36 +3,128 @@ File Controller
 Handles file operations and data management
 """
 
-from typing import Optional
+from typing import Callable, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import queue
 from tkinter import messagebox, filedialog
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
+import time
 import re
 from models.file_handler import FileHandler
 
 class FileController:
     """Handles file operations"""
     
+    # Export format -> (file extension, save dialog file types)
+    EXPORT_FORMATS = {
+        'excel': ('xlsx', (("Excel files", "*.xlsx"),)),
+        'csv': ('csv', (("CSV files", "*.csv"),))
+    }
+    
+    # Upload file type -> EmployeeDataset attribute that stores the parsed data
+    UPLOAD_DATASETS = {
+        'current_system': 'current_system',
+        'previous_reference': 'previous_reference',
+        'masterlist_current': 'masterlist_current',
+        'masterlist_resigned': 'masterlist_resigned'
+    }
+    
+    # Single-sheet export data type -> EmployeeDataset attribute holding the data
+    EXPORT_DATASETS = {
+        'unmatched_for_review': 'unmatched_data',
+        'fuzzy_logic_matches': 'fuzzy_matched_data'
+    }
+    
+    # Interval (ms) at which the Tk main thread picks up finished background tasks
+    POLL_MS = 50
+    
     def __init__(self, main_controller):
         self.main_controller = main_controller
-        self.file_handler = FileHandler()
+        self.file_handler: FileHandler = main_controller.file_handler
+        
+        # Worker pool for file parsing and export writes, so the Tk main thread stays responsive.
+        # Workers never touch Tk: finished tasks are queued and picked up on the main thread
+        self._executor = ThreadPoolExecutor(max_workers=2)
+        self._finished_tasks: queue.Queue = queue.Queue()
+        self._pending_tasks = 0
+        
+        # File type -> path of the upload being parsed for it; a parse whose path is no longer
+        # here was superseded by a newer upload for the same card (or the files were cleared)
+        self.pending_uploads: Dict[str, str] = {}
+    
+    def run_in_background(self, task: Callable, on_success: Callable, on_error: Callable):
+        """Run task on the worker pool and hand its result (or error) back to the Tk main thread"""
+        start_polling = self._pending_tasks == 0
+        self._pending_tasks += 1
+        future = self._executor.submit(task)
+        future.add_done_callback(lambda done: self._finished_tasks.put((done, on_success, on_error)))
+        if start_polling:
+            self.main_controller.main_window.root.after(self.POLL_MS, self.drain_finished_tasks)
+    
+    def drain_finished_tasks(self):
+        """Run the callbacks of finished background tasks (runs on the Tk main thread)"""
+        try:
+            while True:
+                try:
+                    future, on_success, on_error = self._finished_tasks.get_nowait()
+                except queue.Empty:
+                    break
+                
+                self._pending_tasks -= 1
+                error = future.exception()
+                if error is not None:
+                    on_error(error)
+                else:
+                    on_success(future.result())
+        finally:
+            # Keep polling while tasks are still running (even if a callback failed)
+            if self._pending_tasks:
+                self.main_controller.main_window.root.after(self.POLL_MS, self.drain_finished_tasks)
+    
+    def restore_cursor(self):
+        """Reset the wait cursor once no background task is left running"""
+        if not self._pending_tasks:
+            self.main_controller.main_window.root.config(cursor="")
     
     def handle_file_upload(self, file_type: str, file_path: str):
         """Handle file upload request"""
+        file_extension = Path(file_path).suffix.lower()
+        if file_extension not in ['.csv', '.xlsx', '.xls']:
+            messagebox.showerror("Error", "Unsupported file format. Please upload CSV, XLS, or XLSX files.")
+            return
+        
+        # Show loading state
+        self.main_controller.main_window.root.config(cursor="wait")
+        
+        # Parse the file off the main thread
+        self.pending_uploads[file_type] = file_path
+        self.run_in_background(
+            lambda: self.load_file(file_path, file_extension),
+            lambda result: self.on_file_loaded(file_type, file_path, result),
+            lambda error: self.on_file_load_failed(file_type, file_path, error)
+        )
+    
+    def load_file(self, file_path: str, file_extension: str) -> Tuple[pd.DataFrame, Tuple[str, str, int, int]]:
+        """Load file based on extension (runs on the worker pool)"""
+        if file_extension == '.csv':
+            df = self.file_handler.detect_and_load_csv(file_path)
+        else:
+            df = self.file_handler.detect_and_load_excel(file_path)
+        
+        # Name and size come from the frame just parsed, so the file is only read once
+        file_info = self.file_handler.get_file_info(file_path, df)
+        return df, file_info
+    
+    def on_file_loaded(self, file_type: str, file_path: str, result: Tuple[pd.DataFrame, Tuple[str, str, int, int]]):
+        """Store loaded file data and update the view (runs on the Tk main thread)"""
         try:
-            # Show loading state
-            self.main_controller.main_window.root.config(cursor="wait")
-            
-            # Load file based on extension
-            file_extension = Path(file_path).suffix.lower()
-            if file_extension == '.csv':
-                df = self.file_handler.detect_and_load_csv(file_path)
-            elif file_extension in ['.xlsx', '.xls']:
-                df = self.file_handler.detect_and_load_excel(file_path)
-            else:
-                messagebox.showerror("Error", "Unsupported file format. Please upload CSV, XLS, or XLSX files.")
+            # Skip parses superseded by a newer upload for the same card (or cleared meanwhile)
+            if self.pending_uploads.get(file_type) != file_path:
                 return
+            del self.pending_uploads[file_type]
+            
+            df, (file_name, _, row_count, col_count) = result
             
             # Validate data
             if df.empty:
@@ -43,7 +135,6 @@ class FileController:
             self.store_file_data(file_type, df, file_path)
             
             # Update view
-            file_name, _, row_count, col_count = self.file_handler.get_file_info(file_path)
             self.main_controller.main_window.file_upload_view.update_file_card(
                 file_type, file_name, row_count, col_count
             )
@@ -52,10 +143,37 @@ class FileController:
             if self.main_controller.employee_dataset.is_ready_for_processing():
                 self.main_controller.show_preview_section()
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to parse file:\n{str(e)}\n\nPlease ensure your file:\n• Is a valid CSV, XLS, or XLSX file\n• Contains column headers in the first row\n• Is not corrupted or password-protected")
         finally:
-            self.main_controller.main_window.root.config(cursor="")
+            self.restore_cursor()
+    
+    def on_file_load_failed(self, file_type: str, file_path: str, error: Exception):
+        """Report a file parsing failure (runs on the Tk main thread)"""
+        self.restore_cursor()
+        
+        # A superseded (or cleared) upload failing doesn't concern the user any more
+        if self.pending_uploads.get(file_type) != file_path:
+            return
+        del self.pending_uploads[file_type]
+        
+        messagebox.showerror("Error", f"Failed to parse file:\n{str(error)}\n\nPlease ensure your file:\n• Is a valid CSV, XLS, or XLSX file\n• Contains column headers in the first row\n• Is not corrupted or password-protected")
+    
+    def export_in_background(self, write_task: Callable, success_message: str):
+        """Write an export on the worker pool and report the outcome on the Tk main thread"""
+        root = self.main_controller.main_window.root
+        root.config(cursor="wait")
+        self.main_controller.update_progress(100, "Exporting data...")
+        
+        def on_success(_):
+            self.restore_cursor()
+            self.main_controller.update_progress(100, "Export completed")
+            messagebox.showinfo("Success", success_message)
+        
+        def on_error(error):
+            self.restore_cursor()
+            self.main_controller.update_progress(100, "Export failed")
+            messagebox.showerror("Error", f"Export failed:\n{str(error)}")
+        
+        self.run_in_background(write_task, on_success, on_error)
     
     def store_file_data(self, file_type: str, df: pd.DataFrame, file_path: str):
         """Store file data in the model"""
@@ -69,20 +187,14 @@ class FileController:
             dataset.save_masterlist_path(file_type, file_path)
         
         # Store dataframe
-        if file_type == 'current_system':
-            dataset.current_system = df
-        elif file_type == 'previous_reference':
-            dataset.previous_reference = df
-        elif file_type == 'masterlist_current':
-            dataset.masterlist_current = df
-        elif file_type == 'masterlist_resigned':
-            dataset.masterlist_resigned = df
+        if file_type in self.UPLOAD_DATASETS:
+            setattr(dataset, self.UPLOAD_DATASETS[file_type], df)
     
     def handle_export_request(self, data_type: str, format_type: str):
         """Handle export request"""
         try:
             # Build filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = self._timestamp()
             base_name = "Report"
             
             # Try to get base name from uploaded current system file
@@ -96,67 +208,63 @@ class FileController:
                     self.export_cleaned_data_excel(df, base_name, timestamp)
                 else:
                     self.export_cleaned_data_csv(df, base_name, timestamp)
-            elif data_type == "unmatched_for_review":
-                df = self.main_controller.employee_dataset.unmatched_data
-                filename = self.file_handler.build_filename(base_name, "unmatched_for_review", timestamp, format_type)
-                file_path = filedialog.asksaveasfilename(
-                    defaultextension=f".{format_type}",
-                    initialfile=filename,
-                    filetypes=[("Excel files", "*.xlsx")] if format_type == "excel" else [("CSV files", "*.csv")]
-                )
-                if file_path:
-                    if format_type == "excel":
-                        self.file_handler.export_to_excel(df, file_path)
-                    else:
-                        self.file_handler.export_to_csv(df, file_path)
-                    messagebox.showinfo("Success", f"Data exported to:\n{file_path}")
-            elif data_type == "fuzzy_logic_matches":
-                df = self.main_controller.employee_dataset.fuzzy_matched_data
-                filename = self.file_handler.build_filename(base_name, "fuzzy_logic_matches", timestamp, format_type)
-                file_path = filedialog.asksaveasfilename(
-                    defaultextension=f".{format_type}",
-                    initialfile=filename,
-                    filetypes=[("Excel files", "*.xlsx")] if format_type == "excel" else [("CSV files", "*.csv")]
-                )
-                if file_path:
-                    if format_type == "excel":
-                        self.file_handler.export_to_excel(df, file_path)
-                    else:
-                        self.file_handler.export_to_csv(df, file_path)
-                    messagebox.showinfo("Success", f"Data exported to:\n{file_path}")
+            elif data_type in self.EXPORT_DATASETS:
+                df = getattr(self.main_controller.employee_dataset, self.EXPORT_DATASETS[data_type])
+                self.prompt_and_export(df, base_name, data_type, format_type, timestamp)
             
         except Exception as e:
             messagebox.showerror("Error", f"Export failed:\n{str(e)}")
     
+    @staticmethod
+    def _timestamp() -> str:
+        """Local time as YYYYMMDD_HHMMSS for export filenames"""
+        return time.strftime("%Y%m%d_%H%M%S", time.localtime())
+    
+    def ask_export_path(self, base_name: str, label: str, format_type: str, timestamp: str) -> str:
+        """Ask the user where to save an export; returns an empty string if cancelled"""
+        extension, filetypes = self.EXPORT_FORMATS[format_type]
+        filename = self.file_handler.build_filename(base_name, label, timestamp, extension)
+        return filedialog.asksaveasfilename(
+            defaultextension=f".{extension}",
+            initialfile=filename,
+            filetypes=filetypes
+        )
+    
+    def prompt_and_export(self, df: pd.DataFrame, base_name: str, label: str, format_type: str, timestamp: str):
+        """Ask for a save path and export a single DataFrame in the given format"""
+        file_path = self.ask_export_path(base_name, label, format_type, timestamp)
+        if file_path:
+            if format_type == "excel":
+                write_task = lambda: self.file_handler.export_to_excel(df, file_path)
+            else:
+                write_task = lambda: self.file_handler.export_to_csv(df, file_path)
+            self.export_in_background(write_task, f"Data exported to:\n{file_path}")
+    
     def export_cleaned_data_excel(self, df: pd.DataFrame, base_name: str, timestamp: str):
         """Export cleaned data to Excel with multiple sheets"""
         if df is None or df.empty:
             messagebox.showwarning("No Data", "No data available to export.")
             return
         
-        filename = self.file_handler.build_filename(base_name, "cleaned_report", timestamp, "xlsx")
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            initialfile=filename,
-            filetypes=[("Excel files", "*.xlsx")]
-        )
+        file_path = self.ask_export_path(base_name, "cleaned_report", "excel", timestamp)
         
         if file_path:
-            # Create resigned users dataframe
-            resigned_users = self.get_resigned_users_data(df)
-            
-            # Create current users dataframe (exclude resigned users)
-            current_users = self.get_current_users_data(df)
+            def write_task():
+                # Compute the resigned mask once; each derived sheet is built only when
+                # the writer reaches it, so the subsets are not all held in memory together
+                resigned_mask = self._get_resigned_mask(df)
+                multi_sheet_data = {
+                    'Cleaned Data': df,
+                    'Resigned Users': lambda: self._sort_resigned_users(df, resigned_mask),
+                    'Current Users': lambda: self._sort_current_users(df, ~resigned_mask)
+                }
+                
+                self.file_handler.export_to_excel(df, file_path, multi_sheet_data)
             
-            # Export with multiple sheets
-            multi_sheet_data = {
-                'Cleaned Data': df,
-                'Resigned Users': resigned_users if resigned_users is not None and not resigned_users.empty else pd.DataFrame(columns=df.columns),
-                'Current Users': current_users if current_users is not None and not current_users.empty else pd.DataFrame(columns=df.columns)
-            }
-            
-            self.file_handler.export_to_excel(df, file_path, multi_sheet_data)
-            messagebox.showinfo("Success", f"Data exported to:\n{file_path}\n\nSheets created:\n• Cleaned Data\n• Resigned Users\n• Current Users")
+            self.export_in_background(
+                write_task,
+                f"Data exported to:\n{file_path}\n\nSheets created:\n• Cleaned Data\n• Resigned Users\n• Current Users"
+            )
     
     def export_cleaned_data_csv(self, df: pd.DataFrame, base_name: str, timestamp: str):
         """Export cleaned data to CSV"""
@@ -164,44 +272,48 @@ class FileController:
             messagebox.showwarning("No Data", "No data available to export.")
             return
         
-        filename = self.file_handler.build_filename(base_name, "cleaned_report", timestamp, "csv")
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            initialfile=filename,
-            filetypes=[("CSV files", "*.csv")]
-        )
+        file_path = self.ask_export_path(base_name, "cleaned_report", "csv", timestamp)
         
         if file_path:
-            self.file_handler.export_to_csv(df, file_path)
-            messagebox.showinfo("Success", f"Data exported to:\n{file_path}\n\nNote: CSV format doesn't support multiple sheets. Only main data exported.")
+            self.export_in_background(
+                lambda: self.file_handler.export_to_csv(df, file_path),
+                f"Data exported to:\n{file_path}\n\nNote: CSV format doesn't support multiple sheets. Only main data exported."
+            )
     
     def get_resigned_users_data(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
         """Extract resigned users based on resignation date"""
         if df is None or df.empty:
             return None
         
-        resigned_mask = df['Resignation Date'].notna() & (df['Resignation Date'] != '') & (df['Resignation Date'] != 'None')
-        resigned_users = df[resigned_mask].copy()
-        
-        if resigned_users.empty:
-            return None
-        
-        # Sort by resignation date (most recent first)
-        try:
-            resigned_users['Resignation Date'] = pd.to_datetime(resigned_users['Resignation Date'], format='%m/%d/%Y', errors='coerce')
-            resigned_users = resigned_users.sort_values('Resignation Date', ascending=False)
-            resigned_users['Resignation Date'] = resigned_users['Resignation Date'].dt.strftime('%m/%d/%Y')
-        except:
-            resigned_users = resigned_users.sort_values('Resignation Date', ascending=False)
-        
-        return resigned_users
+        return self._sort_resigned_users(df, self._get_resigned_mask(df))
     
     def get_current_users_data(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
         """Extract current users (exclude resigned users)"""
         if df is None or df.empty:
             return None
         
-        current_mask = df['Resignation Date'].isna() | (df['Resignation Date'] == '') | (df['Resignation Date'] == 'None')
+        return self._sort_current_users(df, ~self._get_resigned_mask(df))
+    
+    def _get_resigned_mask(self, df: pd.DataFrame) -> pd.Series:
+        """Mask of rows with a resignation date (or status value)"""
+        # Empty/"None" placeholders are normalized to NaN when files are loaded
+        return df['Resignation Date'].notna()
+    
+    def _sort_resigned_users(self, df: pd.DataFrame, resigned_mask: pd.Series) -> Optional[pd.DataFrame]:
+        """Select resigned users and sort by resignation date (most recent first)"""
+        if not resigned_mask.any():
+            return None
+        
+        # Dates are parsed once into a temporary sort key; the column itself already holds
+        # MM/DD/YYYY strings (or status values like "ACTIVE"), so it is left untouched
+        parsed_dates = pd.to_datetime(df.loc[resigned_mask, 'Resignation Date'], format='%m/%d/%Y', errors='coerce')
+        resigned_users = df[resigned_mask].assign(_sort_key=parsed_dates)
+        resigned_users = resigned_users.sort_values('_sort_key', ascending=False).drop(columns='_sort_key')
+        
+        return resigned_users
+    
+    def _sort_current_users(self, df: pd.DataFrame, current_mask: pd.Series) -> Optional[pd.DataFrame]:
+        """Select current users and sort by PERNR for consistent ordering"""
         current_users = df[current_mask].copy()
         
         if current_users.empty:
@@ -4,11 +4,13 @@ Coordinates all application components and manages the main application flow
 """
 
 from typing import TYPE_CHECKING, Optional
+from functools import cached_property
+from pathlib import Path
 from models.employee_data import EmployeeDataset
-from models.matching_engine import MatchingEngine
 from models.file_handler import FileHandler
 
 if TYPE_CHECKING:
+    from models.matching_engine import MatchingEngine
     from views.main_window import MainWindow
     from controllers.file_controller import FileController
     from controllers.processing_controller import ProcessingController
@@ -19,7 +21,6 @@ class MainController:
     def __init__(self):
         # Models
         self.employee_dataset = EmployeeDataset()
-        self.matching_engine = MatchingEngine()
         self.file_handler = FileHandler()
         
         # Views
@@ -32,6 +33,12 @@ class MainController:
         # Current state
         self.current_step = 1
     
+    @cached_property
+    def matching_engine(self) -> 'MatchingEngine':
+        """Matching engine, created on first use (not needed until the cleanup step)"""
+        from models.matching_engine import MatchingEngine
+        return MatchingEngine()
+    
     def initialize(self):
         """Initialize the application"""
         # Create main window and sub-controllers
@@ -88,30 +95,16 @@ class MainController:
         """Clear only system report files (keep masterlists)"""
         self.employee_dataset.clear_system_reports()
         
+        # Drop the results of system report parses still in progress
+        for file_type in ('current_system', 'previous_reference'):
+            self.file_controller.pending_uploads.pop(file_type, None)
+        
         # Reset UI components for system reports only
         if self.main_window.file_upload_view:
             self.main_window.file_upload_view.reset_system_report_cards()
         
         # Hide all sections except file upload
-        self.current_step = 1
-        if self.main_window:
-            # Hide preview section
-            if self.main_window.preview_view and self.main_window.preview_view.preview_frame:
-                self.main_window.preview_view.preview_frame.destroy()
-                self.main_window.preview_view.preview_frame = None
-            
-            # Hide cleanup section
-            if self.main_window.cleanup_view and self.main_window.cleanup_view.cleanup_frame:
-                self.main_window.cleanup_view.cleanup_frame.destroy()
-                self.main_window.cleanup_view.cleanup_frame = None
-            # Reset cleanup state if cleanup view exists
-            elif self.main_window.cleanup_view:
-                self.main_window.cleanup_view.reset_cleanup_state()
-            
-            # Hide results section
-            if self.main_window.results_view and self.main_window.results_view.results_frame:
-                self.main_window.results_view.results_frame.destroy()
-                self.main_window.results_view.results_frame = None
+        self._teardown_sections()
         
         # Show success message
         if self.main_window.file_upload_view:
@@ -121,35 +114,51 @@ class MainController:
         """Clear all uploaded files and reset the UI"""
         self.employee_dataset.clear_all_data()
         
+        # Drop the results of parses still in progress
+        self.file_controller.pending_uploads.clear()
+        
         # Reset UI components
         if self.main_window.file_upload_view:
             self.main_window.file_upload_view.reset_all_cards()
         
         # Hide all sections except file upload
-        self.current_step = 1
-        if self.main_window:
-            # Hide preview section
-            if self.main_window.preview_view and self.main_window.preview_view.preview_frame:
-                self.main_window.preview_view.preview_frame.destroy()
-                self.main_window.preview_view.preview_frame = None
-            
-            # Hide cleanup section
-            if self.main_window.cleanup_view and self.main_window.cleanup_view.cleanup_frame:
-                self.main_window.cleanup_view.cleanup_frame.destroy()
-                self.main_window.cleanup_view.cleanup_frame = None
-            # Reset cleanup state if cleanup view exists
-            elif self.main_window.cleanup_view:
-                self.main_window.cleanup_view.reset_cleanup_state()
-            
-            # Hide results section
-            if self.main_window.results_view and self.main_window.results_view.results_frame:
-                self.main_window.results_view.results_frame.destroy()
-                self.main_window.results_view.results_frame = None
+        self._teardown_sections()
         
         # Show success message
         if self.main_window.file_upload_view:
             self.main_window.file_upload_view.show_success("All files cleared. You can now upload new files.")
     
+    def _teardown_sections(self):
+        """Remove the preview, cleanup and results sections, leaving only file upload"""
+        self.current_step = 1
+        if not self.main_window:
+            return
+        
+        preview_view = self.main_window.preview_view
+        cleanup_view = self.main_window.cleanup_view
+        results_view = self.main_window.results_view
+        
+        sections = []
+        if preview_view and preview_view.preview_frame:
+            sections.append((preview_view, 'preview_frame'))
+        if cleanup_view and cleanup_view.cleanup_frame:
+            sections.append((cleanup_view, 'cleanup_frame'))
+        elif cleanup_view:
+            # Reset cleanup state if cleanup view exists
+            cleanup_view.reset_cleanup_state()
+        if results_view and results_view.results_frame:
+            sections.append((results_view, 'results_frame'))
+        
+        # Unpack every section before destroying any, so the layout is recomputed once
+        for view, frame_attr in sections:
+            getattr(view, frame_attr).pack_forget()
+        for view, frame_attr in sections:
+            getattr(view, frame_attr).destroy()
+            setattr(view, frame_attr, None)
+        
+        if sections:
+            self.main_window.root.update_idletasks()
+    
     def show_preview_section(self):
         """Show data preview section"""
         if self.employee_dataset.is_ready_for_processing():
@@ -202,11 +211,13 @@ class MainController:
         """Update UI to show persisted masterlist files"""
         for file_type in ['masterlist_current', 'masterlist_resigned']:
             file_path = self.employee_dataset.file_paths.get(file_type)
-            if file_path:
+            df = getattr(self.employee_dataset, file_type)
+            if file_path and df is not None:
                 try:
-                    file_name, _, row_count, col_count = self.file_handler.get_file_info(file_path)
+                    # Use the already loaded data for counts instead of re-parsing the file
+                    row_count, col_count = df.shape
                     self.main_window.file_upload_view.update_file_card(
-                        file_type, file_name, row_count, col_count
+                        file_type, Path(file_path).name, row_count, col_count
                     )
                 except Exception:
                     pass
@@ -3,15 +3,42 @@ Processing Controller
 Handles data processing operations and cleanup workflow
 """
 
+import re
 import threading
+import numpy as np
 import pandas as pd
-from typing import Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 from tkinter import messagebox
 import time
 
+
+@dataclass
+class MasterlistColumns:
+    """Masterlist columns used to enrich records, detected once per cleanup run"""
+    current_pernr: Optional[str] = None
+    current_full_name: Optional[str] = None
+    resigned_pernr: Optional[str] = None
+    resigned_full_name: Optional[str] = None
+    resigned_date: Optional[str] = None
+    # Target column (e.g. "Position Name") -> masterlist_current column holding it
+    organizational: Dict[str, str] = field(default_factory=dict)
+
+
 class ProcessingController:
     """Handles data processing operations"""
     
+    # Column name keywords (matched against lowercase column names), compiled once
+    USER_ID_PATTERN = re.compile(r'user|id|sysid|username|abbreviation')
+    RESIGNATION_DATE_PATTERN = re.compile(r'resignation|date|end|termination|exit|effectivity|separation|report')
+    ORG_COLUMN_PATTERNS = {
+        'Position Name': re.compile(r'position|job|title|role|pos\. name'),
+        'Segment Name': re.compile(r'segment'),
+        'Group Name': re.compile(r'group'),
+        'Area/Division Name': re.compile(r'area|division'),
+        'Department/Branch': re.compile(r'department|branch|unit')
+    }
+    
     def __init__(self, main_controller):
         self.main_controller = main_controller
         self.cancel_flag = False
@@ -38,17 +65,15 @@ class ProcessingController:
     def cleanup_worker(self):
         """Worker thread for cleanup process"""
         try:
-            # Track start time for ETA calculation
-            start_time = time.time()
-            
             dataset = self.main_controller.employee_dataset
             matching_engine = self.main_controller.matching_engine
             
-            # Get data copies
-            current_df = dataset.current_system.copy()
-            previous_df = dataset.previous_reference.copy() if dataset.previous_reference is not None else None
-            masterlist_current_df = dataset.masterlist_current.copy() if dataset.masterlist_current is not None else None
-            masterlist_resigned_df = dataset.masterlist_resigned.copy() if dataset.masterlist_resigned is not None else None
+            # Get data: only whole columns are added to or replaced in current_df, so a shallow
+            # copy keeps the uploaded data intact; the other frames are only read
+            current_df = dataset.current_system.copy(deep=False)
+            previous_df = dataset.previous_reference
+            masterlist_current_df = dataset.masterlist_current
+            masterlist_resigned_df = dataset.masterlist_resigned
             
             # Get total rows for progress calculation
             total_rows = len(current_df)
@@ -68,118 +93,102 @@ class ProcessingController:
             # Detect columns for lookup once (outside the loop for performance)
             user_id_current, user_id_previous, pernr_previous = self.detect_lookup_columns(current_df, previous_df)
             
-            # Process each row to add PERNR, Full Name, Resignation Date, and Organizational Data
+            # Step 1: Lookup PERNR by User ID from previous_reference (if available) for all rows at once
+            user_id_pernrs = {}
+            if has_previous_reference and user_id_current and user_id_previous and pernr_previous:
+                user_id_pernrs = self.lookup_pernrs_by_user_id(
+                    current_df, previous_df, user_id_current, user_id_previous, pernr_previous
+                )
+            
+            # Detect masterlist columns and index masterlist rows by PERNR once, instead of
+            # scanning columns and converting/filtering a copy of the masterlist for every row
+            masterlist_columns = self.detect_masterlist_columns(masterlist_current_df, masterlist_resigned_df)
+            masterlist_current_index = self._build_pernr_index(masterlist_current_df, masterlist_columns.current_pernr)
+            masterlist_resigned_index = self._build_pernr_index(masterlist_resigned_df, masterlist_columns.resigned_pernr)
+            
+            # Get the current system's username/full name column for name matching
+            name_columns_current = [col for col, col_lower in self._columns_with_lowercase(current_df)
+                                    if 'username' in col_lower or 'name' in col_lower]
+            if name_columns_current:
+                current_names = current_df[name_columns_current[0]]
+            else:
+                current_names = pd.Series(None, index=current_df.index, dtype=object)
+            
+            # Step 2: Lookup using name matching (if User ID lookup failed or no Previous Reference)
+            # Names are matched in batches against each masterlist instead of rescanning it per row
+            name_matches = self.match_names(current_names, user_id_pernrs, masterlist_current_df, masterlist_resigned_df)
+            if self.cancel_flag:
+                self.finish_cancelled()
+                return
+            
+            # Per-row results, collected by position and assigned as whole columns after the loop
+            employee_numbers = [None] * total_rows
+            full_names = [None] * total_rows
+            full_name_sources = [None] * total_rows
+            match_types = ["no_match"] * total_rows
+            match_scores = [0.0] * total_rows
+            
+            # Process each row to add PERNR and Full Name
+            # Track start time for ETA calculation
+            start_time = time.time()
             rows_processed = 0
-            for idx, row in current_df.iterrows():
+            update_every = max(1, total_rows // 200)
+            for position, idx in enumerate(current_df.index):
                 # Check for cancellation
                 if self.cancel_flag:
-                    self.main_controller.update_progress(0, "Cleanup cancelled by user")
-                    # Reset run button
-                    if self.main_controller.main_window.cleanup_view:
-                        self.main_controller.main_window.cleanup_view.reset_run_button()
+                    self.finish_cancelled()
                     return
                 
                 rows_processed += 1
-                employee_number = None
                 full_name = None
                 full_name_source = None  # Track where full name came from
                 match_type = "no_match"  # Initialize match tracking
                 match_score = 0.0
                 
-                # Step 1: Lookup PERNR by User ID from previous_reference (if available)
-                if has_previous_reference and user_id_current and user_id_previous and pernr_previous:
-                    user_id = row.get(user_id_current)
-                    if pd.notna(user_id):
-                        match = previous_df[previous_df[user_id_previous] == user_id]
-                        if not match.empty:
-                            # Handle all types of PERNR values (numeric, text, special formats)
-                            pernr_value = match.iloc[0][pernr_previous]
-                            
-                            # Check if PERNR is valid (not "cant find", "unknown", etc.)
-                            if self.main_controller.matching_engine.is_valid_pernr(pernr_value):
-                                # Convert to string and clean up whitespace
-                                pernr_str = str(pernr_value).strip()
-                                
-                                # Return the PERNR as-is if it has any content
-                                # This includes values like "SAMU-  ", "generic", numeric values, etc.
-                                employee_number = pernr_str if pernr_str else None
-                                
-                                if employee_number is not None:
-                                    match_type = "user_id_match"  # Track User ID match
-                                    match_score = 100.0
-                            # If PERNR is invalid (like "cant find"), employee_number remains None
-                            # and will trigger name matching fallback
+                # Step 1: Use the PERNR found by User ID, if any
+                # Invalid PERNRs (like "cant find") were skipped and will trigger name matching fallback
+                employee_number = user_id_pernrs.get(idx)
+                if employee_number is not None:
+                    match_type = "user_id_match"  # Track User ID match
+                    match_score = 100.0
+                elif idx in name_matches:
+                    employee_number, full_name, full_name_source, match_type, match_score = name_matches[idx]
                 
-                # Step 2: Lookup using name matching (if User ID lookup failed or no Previous Reference)
-                if employee_number is None:
-                    # Get the current system's username/full name for comparison
-                    current_name = None
-                    name_columns_current = [col for col in current_df.columns if 'username' in str(col).lower() or 'name' in str(col).lower()]
-                    if name_columns_current:
-                        current_name = row.get(name_columns_current[0])
-                    
-                    if current_name and pd.notna(current_name):
-                        # Try to find matching employee in masterlist_current
-                        if masterlist_current_df is not None:
-                            employee_number, full_name, match_type, match_score = self.main_controller.matching_engine.find_employee_by_name(
-                                current_name, masterlist_current_df
-                            )
-                            if full_name is not None:
-                                full_name_source = "Current Masterlist"
-                        
-                        # If not found in current, try masterlist_resigned
-                        if employee_number is None and masterlist_resigned_df is not None:
-                            employee_number, full_name, match_type, match_score = self.main_controller.matching_engine.find_employee_by_name(
-                                current_name, masterlist_resigned_df
-                            )
-                            if full_name is not None:
-                                full_name_source = "Resigned Masterlist"
+                # Record all found data (or leave as None)
+                employee_numbers[position] = employee_number
+                full_names[position] = full_name
+                full_name_sources[position] = full_name_source
+                match_types[position] = match_type
+                match_scores[position] = match_score
                 
-                # Step 3: If PERNR was found but Full Name is still missing, lookup Full Name from masterlists
-                if employee_number is not None and full_name is None:
-                    full_name, full_name_source = self.get_full_name_from_pernr(
-                        employee_number, masterlist_current_df, masterlist_resigned_df
-                    )
-                
-                # Step 4: Lookup Resignation Date from resigned employee list if PERNR was found
-                resignation_date = self.get_resignation_date(employee_number, masterlist_resigned_df)
-                
-                # Step 5: Lookup Organizational Data from current employee list if PERNR was found
-                org_data = self.get_organizational_data(employee_number, masterlist_current_df)
-                
-                # Assign all found data (or leave as None)
-                self.update_employee_record(
-                    current_df, idx, employee_number, full_name, full_name_source, resignation_date,
-                    org_data, match_type, match_score
+                # Update progress with estimated time remaining, at most ~200 times per run
+                # (every update formats a status message and schedules a Tk callback)
+                if rows_processed % update_every and rows_processed != total_rows:
+                    continue
+                progress = 80 + (position / total_rows) * 10
+                time_str = self.estimate_time_remaining(start_time, rows_processed, total_rows)
+                self.main_controller.update_progress(
+                    progress, f"Processing row {rows_processed} of {total_rows}... (Est. {time_str} remaining)"
                 )
-                
-                # Update progress with estimated time remaining
-                progress = 20 + (idx / len(current_df)) * 70
-                
-                # Calculate estimated time remaining
-                elapsed_time = time.time() - start_time
-                if rows_processed > 0:
-                    avg_time_per_row = elapsed_time / rows_processed
-                    remaining_rows = total_rows - rows_processed
-                    estimated_seconds = avg_time_per_row * remaining_rows
-                    
-                    # Format time remaining
-                    if estimated_seconds < 60:
-                        time_str = f"{int(estimated_seconds)}s"
-                    elif estimated_seconds < 3600:
-                        minutes = int(estimated_seconds // 60)
-                        seconds = int(estimated_seconds % 60)
-                        time_str = f"{minutes}m {seconds}s"
-                    else:
-                        hours = int(estimated_seconds // 3600)
-                        minutes = int((estimated_seconds % 3600) // 60)
-                        time_str = f"{hours}h {minutes}m"
-                    
-                    status_msg = f"Processing row {idx + 1} of {len(current_df)}... (Est. {time_str} remaining)"
-                else:
-                    status_msg = f"Processing row {idx + 1} of {len(current_df)}..."
-                
-                self.main_controller.update_progress(progress, status_msg)
+            
+            # Assign the per-row results one column at a time
+            for col, values in (('PERNR', employee_numbers), ('Full Name (From Masterlist)', full_names),
+                                ('Full Name Source', full_name_sources), ('Match Type', match_types),
+                                ('Match Score', match_scores)):
+                current_df[col] = pd.Series(values, index=current_df.index, dtype=object)
+            
+            # Integer join key for the masterlist lookups, converted once for all rows
+            # (text PERNRs like "SAMU-" stay in the PERNR column and get no key)
+            pernr_keys = self._pernr_keys(current_df['PERNR'])
+            
+            # Step 3: If PERNR was found but Full Name is still missing, lookup Full Name from masterlists
+            self.add_full_names_from_pernr(current_df, pernr_keys, masterlist_columns,
+                                           masterlist_current_index, masterlist_resigned_index)
+            
+            # Step 4: Lookup Resignation Dates from resigned employee list for all found PERNRs
+            # Step 5: Lookup Organizational Data from current employee list for all found PERNRs
+            self.add_resignation_dates(current_df, pernr_keys, masterlist_resigned_index, masterlist_columns)
+            self.add_organizational_data(current_df, pernr_keys, masterlist_current_index, masterlist_columns)
             
             self.main_controller.update_progress(95, "Generating clean reports...")
             
@@ -204,8 +213,32 @@ class ProcessingController:
                 0, lambda: self.main_controller.main_window.cleanup_view.reset_run_button()
             )
     
+    def finish_cancelled(self):
+        """Report a cancelled cleanup and reset the run button"""
+        self.main_controller.update_progress(0, "Cleanup cancelled by user")
+        # Reset run button
+        if self.main_controller.main_window.cleanup_view:
+            self.main_controller.main_window.cleanup_view.reset_run_button()
+    
+    def estimate_time_remaining(self, start_time: float, done: int, total: int) -> str:
+        """Format the estimated time left for a step started at start_time with done of total items finished"""
+        elapsed_time = time.time() - start_time
+        estimated_seconds = elapsed_time / done * (total - done)
+        
+        # Format time remaining
+        if estimated_seconds < 60:
+            return f"{int(estimated_seconds)}s"
+        elif estimated_seconds < 3600:
+            minutes = int(estimated_seconds // 60)
+            seconds = int(estimated_seconds % 60)
+            return f"{minutes}m {seconds}s"
+        else:
+            hours = int(estimated_seconds // 3600)
+            minutes = int((estimated_seconds % 3600) // 60)
+            return f"{hours}h {minutes}m"
+    
     def initialize_new_columns(self, df: pd.DataFrame):
-        """Initialize new columns for enriched data"""
+        """Initialize new columns for enriched data (fixes their order in the output)"""
         new_columns = [
             'PERNR', 'Full Name (From Masterlist)', 'Full Name Source',
             'Resignation Date',
@@ -219,6 +252,10 @@ class ProcessingController:
     
     def detect_lookup_columns(self, current_df: pd.DataFrame, previous_df: Optional[pd.DataFrame]) -> tuple:
         """Detect columns for lookup with flexible matching"""
+        # Lowercase column names once per frame for the keyword checks below
+        current_columns = self._columns_with_lowercase(current_df)
+        previous_columns = self._columns_with_lowercase(previous_df)
+        
         # Current System - User ID column
         user_id_current = None
         if current_df is not None:
@@ -228,8 +265,7 @@ class ProcessingController:
                 user_id_current = exact_match[0]
             else:
                 # Try flexible matching
-                flexible_match = [col for col in current_df.columns 
-                                 if any(keyword in str(col).lower() for keyword in ['user', 'id', 'sysid', 'username', 'abbreviation'])]
+                flexible_match = [col for col, col_lower in current_columns if self.USER_ID_PATTERN.search(col_lower)]
                 if flexible_match:
                     user_id_current = flexible_match[0]
         
@@ -242,8 +278,7 @@ class ProcessingController:
                 user_id_previous = exact_match[0]
             else:
                 # Try flexible matching
-                flexible_match = [col for col in previous_df.columns 
-                                 if any(keyword in str(col).lower() for keyword in ['user', 'id', 'sysid', 'username', 'abbreviation'])]
+                flexible_match = [col for col, col_lower in previous_columns if self.USER_ID_PATTERN.search(col_lower)]
                 if flexible_match:
                     user_id_previous = flexible_match[0]
         
@@ -256,60 +291,123 @@ class ProcessingController:
                 pernr_previous = exact_match[0]
             else:
                 # Try flexible matching
-                flexible_match = [col for col in previous_df.columns 
-                                 if str(col).upper() == 'PERNR' or ('employee' in str(col).lower() and 'number' in str(col).lower())]
+                flexible_match = [col for col, col_lower in previous_columns
+                                 if col_lower == 'pernr' or ('employee' in col_lower and 'number' in col_lower)]
                 if flexible_match:
                     pernr_previous = flexible_match[0]
         
         return user_id_current, user_id_previous, pernr_previous
     
-    def get_full_name_from_pernr(self, employee_number: str, masterlist_current_df: Optional[pd.DataFrame], 
-                                 masterlist_resigned_df: Optional[pd.DataFrame]) -> Tuple[Optional[str], Optional[str]]:
+    def lookup_pernrs_by_user_id(self, current_df: pd.DataFrame, previous_df: pd.DataFrame, user_id_current: str,
+                                 user_id_previous: str, pernr_previous: str) -> dict:
         """
-        Get full name using PERNR from masterlists
+        Lookup PERNRs for all rows by User ID with a single hashed lookup into previous_reference
         
         Returns:
-            Tuple of (full_name, source) where source is "Current Masterlist" or "Resigned Masterlist" or None
+            Dict of current_df index -> PERNR string, for rows whose User ID maps to a valid PERNR
         """
-        if not employee_number:
-            return None, None
+        # The first row for each User ID wins, like a top-down scan would.
+        # Series.map is used rather than merge so User ID columns with different dtypes
+        # simply don't match instead of raising.
+        pernr_by_user_id = (previous_df[[user_id_previous, pernr_previous]]
+                            .dropna(subset=[user_id_previous])
+                            .drop_duplicates(subset=user_id_previous)
+                            .set_index(user_id_previous)[pernr_previous])
+        pernr_values = current_df[user_id_current].map(pernr_by_user_id)
         
-        # Convert employee_number to integer for proper comparison
-        emp_num_numeric = pd.to_numeric(employee_number, errors='coerce')
-        if pd.notna(emp_num_numeric):
-            emp_num_numeric = int(emp_num_numeric)
-        else:
-            return None, None
+        # Convert to string and clean up whitespace
+        # This keeps values like "SAMU-  ", "generic", numeric values, etc.
+        matching_engine = self.main_controller.matching_engine
+        pernr_strs = pernr_values.dropna().astype(matching_engine.STRING_DTYPE).str.strip()
+        
+        # Check if PERNR is valid (not empty, not "cant find", "unknown", etc.) in one pass
+        invalid_pernrs = matching_engine.INVALID_PERNR_SET
+        valid_pernrs = pernr_strs[(pernr_strs != '') & ~pernr_strs.str.lower().isin(invalid_pernrs)]
+        return dict(zip(valid_pernrs.index, valid_pernrs))
+    
+    def match_names(self, current_names: pd.Series, user_id_pernrs: dict, masterlist_current_df: Optional[pd.DataFrame],
+                    masterlist_resigned_df: Optional[pd.DataFrame]) -> dict:
+        """
+        Match the names of all rows without a User ID PERNR against the masterlists
+        
+        Names are looked up in masterlist_current first; those still without a PERNR are
+        then looked up in masterlist_resigned. Fuzzy matching reports progress (20-80%) as
+        it goes and stops early when the cleanup is cancelled.
+        
+        Returns:
+            Dict of current_df index -> (employee_number, full_name, full_name_source, match_type, match_score)
+        """
+        matching_engine = self.main_controller.matching_engine
+        results = {}
+        
+        pending = [idx for idx, name in current_names.items()
+                   if idx not in user_id_pernrs and name and pd.notna(name)]
+        
+        for step, (masterlist_df, source) in enumerate(((masterlist_current_df, "Current Masterlist"),
+                                                        (masterlist_resigned_df, "Resigned Masterlist"))):
+            if masterlist_df is None or not pending or self.cancel_flag:
+                continue
+            
+            # Each masterlist gets half of the matching progress range, with its own ETA
+            start_time = time.time()
+            
+            def report_progress(scored: int, total: int) -> bool:
+                progress = 20 + (step + scored / total) * 30
+                time_str = self.estimate_time_remaining(start_time, scored, total)
+                self.main_controller.update_progress(
+                    progress, f"Matching names against the {source}: {scored} of {total}... (Est. {time_str} remaining)"
+                )
+                return not self.cancel_flag
+            
+            matches = matching_engine.find_employees_by_name(current_names.loc[pending].tolist(), masterlist_df,
+                                                             report_progress)
+            for idx, (employee_number, full_name, match_type, match_score) in zip(pending, matches):
+                # Keep the earlier source if this masterlist found no name
+                full_name_source = source if full_name is not None else results.get(idx, (None,) * 3)[2]
+                results[idx] = (employee_number, full_name, full_name_source, match_type, match_score)
+            
+            # If not found in current, try masterlist_resigned
+            pending = [idx for idx in pending if results[idx][0] is None]
+        
+        return results
+    
+    def detect_masterlist_columns(self, masterlist_current_df: Optional[pd.DataFrame],
+                                  masterlist_resigned_df: Optional[pd.DataFrame]) -> MasterlistColumns:
+        """Detect the masterlist columns used for Full Name, Resignation Date and Organizational Data lookups"""
+        columns = MasterlistColumns()
+        
+        # Lowercase column names once per masterlist for the keyword checks below
+        current_columns = self._columns_with_lowercase(masterlist_current_df)
+        resigned_columns = self._columns_with_lowercase(masterlist_resigned_df)
         
-        # Try masterlist_current first
-        pernr_col = None
         if masterlist_current_df is not None:
             # Check for PERNR column first, then "Pers. Number"
             if 'PERNR' in masterlist_current_df.columns:
-                pernr_col = 'PERNR'
+                columns.current_pernr = 'PERNR'
             elif 'Pers. Number' in masterlist_current_df.columns:
-                pernr_col = 'Pers. Number'
+                columns.current_pernr = 'Pers. Number'
         
-        if pernr_col is not None:
+        if columns.current_pernr is not None:
             # Check for Full Name column - prioritize exact "Full Name" match
             name_columns = [col for col in masterlist_current_df.columns if col == 'Full Name']
             if not name_columns:
                 # Fallback to flexible matching (could be "Name", "Employee Name", etc.)
-                name_columns = [col for col in masterlist_current_df.columns if 'name' in str(col).lower()]
+                name_columns = [col for col, col_lower in current_columns if 'name' in col_lower]
             if name_columns:
-                # Convert masterlist PERNR to integer for comparison
-                masterlist_current_df_copy = masterlist_current_df.copy()
-                masterlist_current_df_copy[pernr_col] = pd.to_numeric(masterlist_current_df_copy[pernr_col], errors='coerce')
-                masterlist_current_df_copy[pernr_col] = masterlist_current_df_copy[pernr_col].astype('Int64')
-                match = masterlist_current_df_copy[masterlist_current_df_copy[pernr_col] == emp_num_numeric]
-                if not match.empty:
-                    # Get the original index to retrieve the full name from original dataframe
-                    original_idx = match.index[0]
-                    full_name_value = masterlist_current_df.loc[original_idx, name_columns[0]]
-                    return full_name_value, "Current Masterlist"
+                columns.current_full_name = name_columns[0]
+            
+            # Find organizational columns
+            for target_col, pattern in self.ORG_COLUMN_PATTERNS.items():
+                # Find matching column in masterlist
+                matching_cols = [col for col, col_lower in current_columns if pattern.search(col_lower)]
+                
+                if matching_cols:
+                    # Use the first matching column found
+                    columns.organizational[target_col] = matching_cols[0]
         
-        # If not found in current, try masterlist_resigned
         if masterlist_resigned_df is not None and 'PERNR' in masterlist_resigned_df.columns:
+            columns.resigned_pernr = 'PERNR'
+            
             # Prioritize "Fullname" column, then flexible matching for name columns
             name_columns = [col for col in masterlist_resigned_df.columns if col == 'Fullname']
             if not name_columns:
@@ -317,202 +415,193 @@ class ProcessingController:
                 name_columns = [col for col in masterlist_resigned_df.columns if col == 'Full Name']
             if not name_columns:
                 # Fallback to flexible matching (could be "Name", "Employee Name", etc.)
-                name_columns = [col for col in masterlist_resigned_df.columns if 'name' in str(col).lower()]
-            
+                name_columns = [col for col, col_lower in resigned_columns if 'name' in col_lower]
             if name_columns:
-                # Convert masterlist PERNR to integer for comparison
-                masterlist_resigned_df_copy = masterlist_resigned_df.copy()
-                masterlist_resigned_df_copy['PERNR'] = pd.to_numeric(masterlist_resigned_df_copy['PERNR'], errors='coerce')
-                masterlist_resigned_df_copy['PERNR'] = masterlist_resigned_df_copy['PERNR'].astype('Int64')
-                match = masterlist_resigned_df_copy[masterlist_resigned_df_copy['PERNR'] == emp_num_numeric]
-                if not match.empty:
-                    # Get the original index to retrieve the full name from original dataframe
-                    original_idx = match.index[0]
-                    full_name_value = masterlist_resigned_df.loc[original_idx, name_columns[0]]
-                    # Only return if the full name is not empty/null
-                    if pd.notna(full_name_value) and str(full_name_value).strip():
-                        return full_name_value, "Resigned Masterlist"
-        
-        return None, None
-    
-    def get_resignation_date(self, employee_number: Optional[str], masterlist_resigned_df: Optional[pd.DataFrame]) -> Optional[str]:
-        """
-        Get resignation date or status for employees
-        Returns actual dates in MM/DD/YYYY format, or status values like "ACTIVE", "RETRACTED", etc.
-        """
-        if not employee_number or masterlist_resigned_df is None or 'PERNR' not in masterlist_resigned_df.columns:
-            return None
-        
-        # Convert employee_number to integer for proper comparison
-        emp_num_numeric = pd.to_numeric(employee_number, errors='coerce')
-        if pd.notna(emp_num_numeric):
-            emp_num_numeric = int(emp_num_numeric)
-        else:
-            return None
-        
-        # Convert masterlist PERNR to integer for comparison
-        masterlist_resigned_df_copy = masterlist_resigned_df.copy()
-        masterlist_resigned_df_copy['PERNR'] = pd.to_numeric(masterlist_resigned_df_copy['PERNR'], errors='coerce')
-        masterlist_resigned_df_copy['PERNR'] = masterlist_resigned_df_copy['PERNR'].astype('Int64')
-        match = masterlist_resigned_df_copy[masterlist_resigned_df_copy['PERNR'] == emp_num_numeric]
-        
-        if not match.empty:
+                columns.resigned_full_name = name_columns[0]
+            
             # Prioritize "Effectivity from HR Separation Report" column, then fallback to other date columns
-            date_columns = [col for col in masterlist_resigned_df.columns if 'effectivity from hr separation report' in str(col).lower()]
+            date_columns = [col for col, col_lower in resigned_columns if 'effectivity from hr separation report' in col_lower]
             
             # If not found, try other effectivity-related columns
             if not date_columns:
-                date_columns = [col for col in masterlist_resigned_df.columns if 'effectivity' in str(col).lower() and 'separation' in str(col).lower()]
+                date_columns = [col for col, col_lower in resigned_columns if 'effectivity' in col_lower and 'separation' in col_lower]
             
             # If still not found, try generic separation/resignation/termination date columns
             if not date_columns:
-                date_columns = [col for col in masterlist_resigned_df.columns if any(keyword in str(col).lower() for keyword in ['resignation', 'date', 'end', 'termination', 'exit', 'effectivity', 'separation', 'report'])]
+                date_columns = [col for col, col_lower in resigned_columns if self.RESIGNATION_DATE_PATTERN.search(col_lower)]
             
             if date_columns:
-                # Get the original index to retrieve the resignation date from original dataframe
-                original_idx = match.index[0]
-                raw_date = masterlist_resigned_df.loc[original_idx, date_columns[0]]
-                
-                # Return the raw value if it exists (whether it's a date or status text like "ACTIVE", "RETRACTED", etc.)
-                if pd.notna(raw_date):
-                    raw_value = str(raw_date).strip()
-                    
-                    # Only skip if it's completely empty after stripping
-                    if raw_value:
-                        # Try to parse as date first
-                        try:
-                            if isinstance(raw_date, str):
-                                # Handle string dates
-                                parsed_date = pd.to_datetime(raw_date, errors='coerce')
-                            else:
-                                # Handle datetime objects
-                                parsed_date = pd.to_datetime(raw_date, errors='coerce')
-                            
-                            if pd.notna(parsed_date):
-                                # It's a valid date, format it as MM/DD/YYYY
-                                return parsed_date.strftime('%m/%d/%Y')
-                            else:
-                                # Not a valid date, return the original value as-is
-                                # This handles cases like "ACTIVE", "RETRACTED", etc.
-                                return raw_value
-                        except:
-                            # If date parsing fails, return the original value as-is
-                            # This ensures status values like "ACTIVE", "RETRACTED" are preserved
-                            return raw_value
-                    else:
-                        return None
-                else:
-                    return None
-        
-        return None
+                columns.resigned_date = date_columns[0]
+        
+        return columns
     
-    def get_organizational_data(self, employee_number: Optional[str], masterlist_current_df: Optional[pd.DataFrame]) -> dict:
-        """Get organizational data for employee"""
-        org_data = {
-            'Position Name': None,
-            'Segment Name': None,
-            'Group Name': None,
-            'Area/Division Name': None,
-            'Department/Branch': None
-        }
-        
-        if not employee_number or masterlist_current_df is None:
-            return org_data
-        
-        # Check for PERNR or "Pers. Number" column
-        pernr_col_org = None
-        if 'PERNR' in masterlist_current_df.columns:
-            pernr_col_org = 'PERNR'
-        elif 'Pers. Number' in masterlist_current_df.columns:
-            pernr_col_org = 'Pers. Number'
-        
-        if pernr_col_org is None:
-            return org_data
-        
-        # Convert employee_number to integer for proper comparison
-        emp_num_numeric = pd.to_numeric(employee_number, errors='coerce')
-        if pd.notna(emp_num_numeric):
-            emp_num_numeric = int(emp_num_numeric)
-        else:
-            return org_data
-        
-        # Convert masterlist PERNR to integer for comparison
-        masterlist_current_df_copy = masterlist_current_df.copy()
-        masterlist_current_df_copy[pernr_col_org] = pd.to_numeric(masterlist_current_df_copy[pernr_col_org], errors='coerce')
-        masterlist_current_df_copy[pernr_col_org] = masterlist_current_df_copy[pernr_col_org].astype('Int64')
-        match = masterlist_current_df_copy[masterlist_current_df_copy[pernr_col_org] == emp_num_numeric]
-        
-        if not match.empty:
-            # Get the original index to retrieve organizational data from original dataframe
-            original_idx = match.index[0]
-            
-            # Find and retrieve organizational columns
-            org_columns = {
-                'Position Name': ['position', 'job', 'title', 'role', 'pos. name'],
-                'Segment Name': ['segment'],
-                'Group Name': ['group'],
-                'Area/Division Name': ['area', 'division'],
-                'Department/Branch': ['department', 'branch', 'unit']
-            }
-            
-            for target_col, keywords in org_columns.items():
-                # Find matching column in masterlist
-                matching_cols = [col for col in masterlist_current_df.columns 
-                               if any(keyword in str(col).lower() for keyword in keywords)]
-                
-                if matching_cols:
-                    # Use the first matching column found
-                    value = masterlist_current_df.loc[original_idx, matching_cols[0]]
-                    if pd.notna(value):
-                        org_data[target_col] = str(value)
+    def _columns_with_lowercase(self, df: Optional[pd.DataFrame]) -> list:
+        """List of (column, lowercase column name) pairs, empty if there is no DataFrame"""
+        if df is None:
+            return []
+        return [(col, str(col).lower()) for col in df.columns]
+    
+    def _build_pernr_index(self, masterlist_df: Optional[pd.DataFrame], pernr_col: Optional[str]) -> Optional[pd.DataFrame]:
+        """
+        Index masterlist rows by integer PERNR, converting the PERNR column only once per run
+        
+        Args:
+            masterlist_df: Masterlist dataframe (current or resigned)
+            pernr_col: PERNR column of the masterlist
+            
+        Returns:
+            Masterlist rows with a unique integer PERNR index (the first row wins for duplicate
+            PERNRs), or None if the masterlist or its PERNR column is missing
+        """
+        if masterlist_df is None or pernr_col is None or pernr_col not in masterlist_df.columns:
+            return None
+        
+        # Convert masterlist PERNR to integer for comparison (non-numeric PERNRs can't be looked up)
+        pernrs = pd.to_numeric(masterlist_df[pernr_col], errors='coerce')
+        rows = masterlist_df[pernrs.notna()].set_axis(pernrs.dropna().astype('int64'), axis=0)
+        return rows[~rows.index.duplicated(keep='first')]
+    
+    def _pernr_keys(self, pernrs: pd.Series) -> pd.Series:
+        """
+        Convert PERNR values to integer keys for joining with the masterlists
+        
+        Args:
+            pernrs: PERNR values (strings or None)
+            
+        Returns:
+            Int64 Series aligned to pernrs (NA for missing and text PERNRs like "SAMU-")
+        """
+        numeric = pd.to_numeric(pernrs, errors='coerce')
+        return np.trunc(numeric.where(np.isfinite(numeric))).astype('Int64')
+    
+    def add_full_names_from_pernr(self, df: pd.DataFrame, pernr_keys: pd.Series, masterlist_columns: MasterlistColumns,
+                                  masterlist_current_index: Optional[pd.DataFrame],
+                                  masterlist_resigned_index: Optional[pd.DataFrame]):
+        """
+        Fill the Full Name (From Masterlist) and Full Name Source columns for rows whose PERNR
+        was found (e.g. by User ID) without a full name
+        """
+        missing = df['PERNR'].notna() & df['Full Name (From Masterlist)'].isna() & pernr_keys.notna()
+        
+        # Try masterlist_current first
+        if masterlist_columns.current_full_name is not None:
+            in_current = missing & pernr_keys.isin(masterlist_current_index.index)
+            names = self._lookup_by_pernr(pernr_keys[in_current], masterlist_current_index,
+                                          [masterlist_columns.current_full_name])[masterlist_columns.current_full_name]
+            df.loc[in_current, 'Full Name (From Masterlist)'] = names
+            df.loc[in_current, 'Full Name Source'] = "Current Masterlist"
+            missing &= ~in_current
+        
+        # If not found in current, try masterlist_resigned
+        if masterlist_columns.resigned_full_name is not None:
+            names = self._lookup_by_pernr(pernr_keys[missing], masterlist_resigned_index,
+                                          [masterlist_columns.resigned_full_name])[masterlist_columns.resigned_full_name]
+            # Only use the full name if it is not empty/null
+            names = names[names.notna()]
+            names = names[names.astype(str).str.strip() != '']
+            df.loc[names.index, 'Full Name (From Masterlist)'] = names
+            df.loc[names.index, 'Full Name Source'] = "Resigned Masterlist"
+    
+    def _lookup_by_pernr(self, pernr_keys: pd.Series, pernr_index: pd.DataFrame, value_columns: list) -> pd.DataFrame:
+        """
+        Look up masterlist values for every PERNR with a single hashed reindex
+        
+        Values are looked up as objects, so an integer column (e.g. an org unit code) is not
+        upcast to float when some PERNRs have no match and stays "57" rather than "57.0" once
+        stringified.
+        
+        Args:
+            pernr_keys: Integer PERNR keys (see _pernr_keys)
+            pernr_index: Masterlist rows indexed by integer PERNR (see _build_pernr_index)
+            value_columns: Masterlist columns to return
+            
+        Returns:
+            DataFrame with value_columns aligned to pernr_keys.index (NaN where no row matched)
+        """
+        return pernr_index[value_columns].astype(object).reindex(pernr_keys).set_axis(pernr_keys.index, axis=0)
+    
+    def add_resignation_dates(self, df: pd.DataFrame, pernr_keys: pd.Series, masterlist_resigned_index: Optional[pd.DataFrame],
+                              masterlist_columns: MasterlistColumns):
+        """Fill the Resignation Date column for all rows from the resigned masterlist"""
+        if masterlist_columns.resigned_date is None:
+            return
         
-        return org_data
+        date_col = masterlist_columns.resigned_date
+        raw_dates = self._lookup_by_pernr(pernr_keys, masterlist_resigned_index, [date_col])[date_col]
+        
+        # Format each distinct value once (most employees share a handful of dates and status values)
+        formatted = {value: self._format_resignation_date(value) for value in raw_dates.dropna().unique()}
+        # Missing raw dates and values formatted to None both end up as None (not NaN)
+        dates = raw_dates.map(formatted).astype(object)
+        df['Resignation Date'] = dates.where(dates.notna(), None)
     
-    def update_employee_record(self, df: pd.DataFrame, idx, employee_number: Optional[str], 
-                              full_name: Optional[str], full_name_source: Optional[str], resignation_date: Optional[str], 
-                              org_data: dict, match_type: str, match_score: float):
-        """Update employee record with found data"""
-        df.at[idx, 'PERNR'] = employee_number
-        df.at[idx, 'Full Name (From Masterlist)'] = full_name
-        df.at[idx, 'Full Name Source'] = full_name_source
-        df.at[idx, 'Resignation Date'] = resignation_date
-        df.at[idx, 'Match Type'] = match_type
-        df.at[idx, 'Match Score'] = match_score
-        
-        # Update organizational data
-        for key, value in org_data.items():
-            df.at[idx, key] = value
+    def _format_resignation_date(self, raw_date) -> Optional[str]:
+        """
+        Format a resignation date or status value from the resigned masterlist
+        Returns actual dates in MM/DD/YYYY format, or status values like "ACTIVE", "RETRACTED", etc.
+        """
+        raw_value = str(raw_date).strip()
+        
+        # Only skip if it's completely empty after stripping
+        if not raw_value:
+            return None
+        
+        # Try to parse as date first (handles both string dates and datetime objects)
+        try:
+            parsed_date = pd.to_datetime(raw_date, errors='coerce')
+            if pd.notna(parsed_date):
+                # It's a valid date, format it as MM/DD/YYYY
+                return parsed_date.strftime('%m/%d/%Y')
+        except:
+            pass
+        
+        # Not a valid date, return the original value as-is
+        # This ensures status values like "ACTIVE", "RETRACTED" are preserved
+        return raw_value
+    
+    def add_organizational_data(self, df: pd.DataFrame, pernr_keys: pd.Series, masterlist_current_index: Optional[pd.DataFrame],
+                                masterlist_columns: MasterlistColumns):
+        """Fill the Organizational Data columns for all rows from the current masterlist"""
+        if masterlist_columns.current_pernr is None or not masterlist_columns.organizational:
+            return
+        
+        value_columns = list(dict.fromkeys(masterlist_columns.organizational.values()))
+        org_values = self._lookup_by_pernr(pernr_keys, masterlist_current_index, value_columns)
+        
+        for target_col, masterlist_col in masterlist_columns.organizational.items():
+            values = org_values[masterlist_col]
+            df[target_col] = values.map(str, na_action='ignore').astype(object).where(values.notna(), None)
     
     def finalize_processing(self, current_df: pd.DataFrame, dataset):
         """Finalize processing and create result datasets"""
         # Keep PERNR column as string to preserve all values including "SAMU-  ", "generic", etc.
-        # Only convert numeric PERNRs to clean format, keep text values as-is
-        def clean_pernr(pernr_value):
-            if pd.isna(pernr_value):
-                return None
-            
-            pernr_str = str(pernr_value).strip()
-            if not pernr_str:
-                return None
-            
-            # Try to convert to numeric for cleaning, but keep original if it fails
-            try:
-                numeric_val = pd.to_numeric(pernr_str, errors='coerce')
-                if pd.notna(numeric_val):
-                    return str(int(numeric_val))  # Clean numeric format
-                else:
-                    return pernr_str  # Keep original text format
-            except:
-                return pernr_str  # Keep original text format
-        
-        current_df['PERNR'] = current_df['PERNR'].apply(clean_pernr)
+        # Only convert numeric PERNRs to clean format, keep text values as-is (whole column at once)
+        pernr_strs = current_df['PERNR'].dropna().astype(self.main_controller.matching_engine.STRING_DTYPE).str.strip()
+        pernr_strs = pernr_strs[pernr_strs != '']
+        
+        numeric = pd.to_numeric(pernr_strs, errors='coerce')
+        numeric_mask = numeric.notna() & np.isfinite(numeric.astype('float64'))
+        whole_numbers = numeric[numeric_mask]
+        if whole_numbers.dtype.kind == 'f':
+            whole_numbers = np.trunc(whole_numbers).astype('int64')
+        
+        # Clean numeric format where the PERNR parsed as a number, original text otherwise
+        cleaned = pernr_strs.astype(object)
+        cleaned[numeric_mask] = whole_numbers.astype(str)
+        cleaned = cleaned.reindex(current_df.index)
+        # Let pandas infer the column dtype from the cleaned strings, as it does for apply()
+        current_df['PERNR'] = cleaned.where(cleaned.notna(), None).infer_objects()
+        
+        # The result frames are only read afterwards, and current_df is a private working
+        # copy, so they are stored without copying again
+        pernr_found = current_df['PERNR'].notna()
         
         # Store all data (both matched and unmatched) in cleaned_data
-        dataset.cleaned_data = current_df.copy()
+        dataset.cleaned_data = current_df
         
         # Create separate unmatched data for review (records without PERNR)
-        dataset.unmatched_data = current_df[current_df['PERNR'].isna()].copy()
+        dataset.unmatched_data = current_df[~pernr_found]
         
         # Create fuzzy matched data sheet (records matched using fuzzy logic)
-        fuzzy_matched_mask = (current_df['PERNR'].notna()) & (current_df['Match Type'] == 'fuzzy_match')
-        dataset.fuzzy_matched_data = current_df[fuzzy_matched_mask].copy()
+        fuzzy_matched_mask = pernr_found & (current_df['Match Type'] == 'fuzzy_match')
+        dataset.fuzzy_matched_data = current_df[fuzzy_matched_mask]
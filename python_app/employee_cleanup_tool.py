@@ -6,16 +6,90 @@ Chinabank Corporation Internal System
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
 import numpy as np
 from pathlib import Path
-from typing import Dict, Optional, List, Tuple
-from fuzzywuzzy import fuzz
+from typing import Callable, Dict, Optional, List, Tuple
+from rapidfuzz import fuzz, process
 from datetime import datetime
 import re
+import os
+import csv
+import json
+import hashlib
+import itertools
 import threading
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    # Optional Arrow-backed string columns (vectorized name cleanup)
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+try:
+    # Optional Rust-backed Excel reader (much faster than openpyxl for large masterlists)
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+try:
+    # Optional Rust-backed Excel writer (much faster and lighter than openpyxl for large exports)
+    from rustpy_xlsxwriter import FastExcel
+except ImportError:
+    FastExcel = None
 
 
 class EmployeeCleanupTool:
+    # Number of names scored per fuzzy matching batch, and of masterlist names each batch is
+    # scored against at a time (score matrices stay SCORE_BLOCK_SIZE x CHOICE_BLOCK_SIZE at most)
+    SCORE_BLOCK_SIZE = 500
+    CHOICE_BLOCK_SIZE = 2000
+    
+    # Number of leading rows searched for the header row when loading a file
+    HEADER_SEARCH_ROWS = 10
+    
+    # Cache directory for parsed uploads (keyed by source path, validated by mtime and size)
+    CACHE_DIR = Path(__file__).parent / '.cache' / 'cleanup_tool'
+    
+    # Version of the parsing logic behind cached uploads; bump it whenever loading changes the
+    # parsed DataFrame (header detection, placeholder handling, downcasting)
+    CACHE_VERSION = 1
+    
+    # Excel reader engine (None lets pandas pick openpyxl/xlrd from the file extension)
+    EXCEL_ENGINE = 'calamine' if python_calamine is not None else None
+    
+    # String dtype used to clean names with vectorized string kernels
+    STRING_DTYPE = 'string[pyarrow]' if pyarrow is not None else 'string'
+    
+    # Interval (ms) at which the Tk main thread drains cleanup progress and upload messages
+    PROGRESS_POLL_MS = 50
+    
+    # Most progress messages the cleanup row loop posts for one run
+    PROGRESS_UPDATES = 200
+    
+    # Worker threads for parsing uploads (one per upload card)
+    UPLOAD_WORKERS = 4
+    
+    # Precompiled patterns: MM/DD/YYYY dates, and characters not allowed in export filenames
+    DATE_PATTERN = re.compile(r'^(\d{1,2})/(\d{1,2})/(\d{4})$')
+    FILENAME_UNSAFE_PATTERN = re.compile(r"[^A-Za-z0-9 _\-]")
+    
+    # Column name keywords (matched against lowercase column names)
+    USER_ID_PATTERN = re.compile(r'user|id|sysid|username')
+    RESIGNATION_DATE_PATTERN = re.compile(r'resignation|date|end|termination|exit|effectivity|separation|report')
+    ORG_COLUMN_PATTERNS = {
+        'Position Name': re.compile(r'position|job|title|role|pos\. name'),
+        'Segment Name': re.compile(r'segment'),
+        'Group Name': re.compile(r'group'),
+        'Area/Division Name': re.compile(r'area|division'),
+        'Department/Branch': re.compile(r'department|branch|unit')
+    }
+    
+    # Output columns shown wider in the results preview table
+    KEY_COLUMNS = frozenset({'PERNR', 'Full Name (From Masterlist)', 'Resignation Date', 'Position Name', 'Segment Name', 'Group Name', 'Area/Division Name', 'Department/Branch'})
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Employee Data Clean-Up Tool - Chinabank Corporation")
@@ -41,6 +115,19 @@ class EmployeeCleanupTool:
         self.cleaned_data: Optional[pd.DataFrame] = None
         self.unmatched_data: Optional[pd.DataFrame] = None
         self.fuzzy_matched_data: Optional[pd.DataFrame] = None  # Track fuzzy logic matches
+        
+        # Resigned/current user subsets of cleaned_data, reused while cleaned_data is unchanged
+        # (subset name -> (source DataFrame, subset))
+        self.user_subsets: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]] = {}
+        
+        # Messages from the cleanup worker thread, drained on the Tk main thread
+        self.progress_queue: queue.Queue = queue.Queue()
+        
+        # Uploads are parsed on a worker pool, so several files can parse at once; finished
+        # parses are queued and picked up on the Tk main thread
+        self.parse_pool = ThreadPoolExecutor(max_workers=self.UPLOAD_WORKERS)
+        self.upload_queue: queue.Queue = queue.Queue()
+        self.pending_uploads: Dict[str, str] = {}  # file type -> path being parsed
         self.threshold = 80
         self.use_fuzzy_logic = True  # Default to using fuzzy logic
         self.current_step = 1
@@ -332,67 +419,138 @@ class EmployeeCleanupTool:
         
         return card
     
-    def detect_and_load_csv(self, file_path: str) -> pd.DataFrame:
-        """Detect header row and load CSV file by searching for 'Full Name'"""
-        # First try standard loading
+    def load_with_cache(self, file_path: str) -> pd.DataFrame:
+        """
+        Load an uploaded CSV/Excel file, reusing an earlier parse if the file is unchanged
+        
+        A fresh parse detects the header row and then shrinks integer columns with
+        downcast_integer_columns; that result is pickled to CACHE_DIR, so a cache hit skips
+        both steps. The cached copy is used only while the file's mtime and size and
+        CACHE_VERSION all still match.
+        
+        Args:
+            file_path: Path to the CSV/XLSX/XLS file
+            
+        Returns:
+            Parsed DataFrame
+        """
+        stat = os.stat(file_path)
+        cache_key = f"{self.CACHE_VERSION}-{stat.st_mtime_ns}-{stat.st_size}"
+        cache_name = hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()
+        cache_path = self.CACHE_DIR / f"{cache_name}.pkl"
+        meta_path = self.CACHE_DIR / f"{cache_name}.json"
+        
+        # Fast path: source file unchanged since it was cached
         try:
-            df = pd.read_csv(file_path)
-            if 'Full Name' in df.columns:
-                return df
-        except:
+            with open(meta_path, 'r') as f:
+                if json.load(f).get('key') == cache_key:
+                    return pd.read_pickle(cache_path)
+        except Exception:
+            # Missing or unreadable cache, parse the source file instead
             pass
         
-        # Search for 'Full Name' in the first 10 rows
-        for header_row in range(10):  # Check first 10 rows
-            try:
-                df = pd.read_csv(file_path, header=header_row)
-                if 'Full Name' in df.columns:
-                    return df
-            except:
-                continue
+        # Slow path: parse the source file
+        if Path(file_path).suffix.lower() == '.csv':
+            df = self.detect_and_load_csv(file_path)
+        else:
+            df = self.detect_and_load_excel(file_path)
+        df = self.downcast_integer_columns(df)
         
-        # If 'Full Name' not found, try keyword detection
-        for header_row in range(10):
-            try:
-                df = pd.read_csv(file_path, header=header_row)
-                if self.is_valid_header(df.columns):
-                    return df
-            except:
-                continue
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            df.to_pickle(cache_path)
+            with open(meta_path, 'w') as f:
+                json.dump({'key': cache_key, 'source': str(file_path)}, f)
+        except Exception:
+            # If caching fails, continue without error
+            pass
         
-        # Fallback to first row
-        return pd.read_csv(file_path)
+        return df
+    
+    def downcast_integer_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store int64 columns (e.g. numeric PERNRs) in the smallest integer type that holds them
+        
+        Float columns are left as float64 so no values lose precision, and text columns are
+        not made categorical because the cleanup writes new values into them.
+        
+        Args:
+            df: Freshly parsed DataFrame
+            
+        Returns:
+            DataFrame with downcast integer columns
+        """
+        positions = [i for i, dtype in enumerate(df.dtypes) if dtype == np.int64]
+        if not positions:
+            return df
+        
+        # Assign by position so duplicate column names are handled
+        df = df.copy(deep=False)
+        for i in positions:
+            df.isetitem(i, pd.to_numeric(df.iloc[:, i], downcast='integer'))
+        return df
+    
+    def detect_and_load_csv(self, file_path: str) -> pd.DataFrame:
+        """Detect header row and load CSV file by searching for 'Full Name'"""
+        # Read only the leading rows to find the header, then parse the whole file once
+        # (csv.reader copes with title rows that have fewer fields than the table below)
+        try:
+            with open(file_path, newline='', encoding='utf-8-sig') as f:
+                # Blank lines are skipped, as pandas does when counting header rows
+                probe_rows = list(itertools.islice((row for row in csv.reader(f) if row), self.HEADER_SEARCH_ROWS))
+        except Exception:
+            probe_rows = []
+        
+        return pd.read_csv(file_path, header=self.detect_header_row(probe_rows))
     
     def detect_and_load_excel(self, file_path: str) -> pd.DataFrame:
         """Detect header row and load Excel file by searching for 'Full Name'"""
-        # First try standard loading
+        # Read only the leading rows to find the header, then parse the whole file once
         try:
-            df = pd.read_excel(file_path)
-            if 'Full Name' in df.columns:
-                return df
-        except:
-            pass
+            probe_rows = self.read_excel(file_path, header=None, nrows=self.HEADER_SEARCH_ROWS).values.tolist()
+        except Exception:
+            probe_rows = []
         
-        # Search for 'Full Name' in the first 10 rows
-        for header_row in range(10):  # Check first 10 rows
+        return self.read_excel(file_path, header=self.detect_header_row(probe_rows))
+    
+    def read_excel(self, file_path: str, **kwargs) -> pd.DataFrame:
+        """Read an Excel file with the calamine engine, falling back to pandas' default engine"""
+        if self.EXCEL_ENGINE is not None:
             try:
-                df = pd.read_excel(file_path, header=header_row)
-                if 'Full Name' in df.columns:
-                    return df
-            except:
-                continue
+                return pd.read_excel(file_path, engine=self.EXCEL_ENGINE, **kwargs)
+            except Exception:
+                # Fall back to openpyxl (.xlsx) or xlrd (.xls) below
+                pass
+        
+        return pd.read_excel(file_path, **kwargs)
+    
+    def detect_header_row(self, rows: List[list]) -> int:
+        """
+        Find the header row among the leading rows of a file
+        
+        Args:
+            rows: Leading rows of the file as lists of cell values
+            
+        Returns:
+            Index of the first row containing 'Full Name', else of the first row that
+            looks like a header (see is_valid_header), else 0
+        """
+        # Label blank cells the way pandas names unnamed columns
+        headers = [[f"Unnamed: {i}" if pd.isna(value) or value == '' else value for i, value in enumerate(row)]
+                   for row in rows]
+        
+        # Search for 'Full Name' in the leading rows
+        for header_row, columns in enumerate(headers):
+            if 'Full Name' in columns:
+                return header_row
         
         # If 'Full Name' not found, try keyword detection
-        for header_row in range(10):
-            try:
-                df = pd.read_excel(file_path, header=header_row)
-                if self.is_valid_header(df.columns):
-                    return df
-            except:
-                continue
+        for header_row, columns in enumerate(headers):
+            if self.is_valid_header(columns):
+                return header_row
         
         # Fallback to first row
-        return pd.read_excel(file_path)
+        return 0
     
     def is_valid_header(self, columns) -> bool:
         """Check if columns look like valid headers by looking for expected keywords"""
@@ -426,24 +584,48 @@ class EmployeeCleanupTool:
         
         if not file_path:
             return
+        
+        file_extension = Path(file_path).suffix.lower()
+        if file_extension not in ['.csv', '.xlsx', '.xls']:
+            messagebox.showerror("Error", "Unsupported file format. Please upload CSV, XLS, or XLSX files.")
+            return
+        
+        # Show loading state
+        self.root.config(cursor="wait")
+        
+        # Parse file on the worker pool; try to detect header row automatically
+        # (reusing the parsed copy of an unchanged file)
+        start_polling = not self.pending_uploads
+        self.pending_uploads[file_type] = file_path
+        future = self.parse_pool.submit(self.load_with_cache, file_path)
+        future.add_done_callback(lambda done: self.upload_queue.put((file_type, file_path, done)))
+        if start_polling:
+            self.root.after(self.PROGRESS_POLL_MS, self.drain_upload_queue)
+    
+    def drain_upload_queue(self):
+        """Hand finished upload parses to on_file_loaded (runs on the Tk main thread)"""
+        while True:
+            try:
+                file_type, file_path, future = self.upload_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            # Skip parses superseded by a newer upload for the same card (or cleared meanwhile)
+            if self.pending_uploads.get(file_type) != file_path:
+                continue
             
+            del self.pending_uploads[file_type]
+            self.on_file_loaded(file_type, file_path, future)
+        
+        if self.pending_uploads:
+            self.root.after(self.PROGRESS_POLL_MS, self.drain_upload_queue)
+        else:
+            self.root.config(cursor="")
+    
+    def on_file_loaded(self, file_type: str, file_path: str, future: Future):
+        """Store a parsed upload and update the UI (runs on the Tk main thread)"""
         try:
-            # Show loading message
-            self.root.config(cursor="wait")
-            self.root.update()
-            
-            # Parse file
-            file_extension = Path(file_path).suffix.lower()
-            
-            if file_extension == '.csv':
-                # Try to detect header row automatically
-                df = self.detect_and_load_csv(file_path)
-            elif file_extension in ['.xlsx', '.xls']:
-                # Try to detect header row automatically
-                df = self.detect_and_load_excel(file_path)
-            else:
-                messagebox.showerror("Error", "Unsupported file format. Please upload CSV, XLS, or XLSX files.")
-                return
+            df = future.result()
                 
             # Validate data
             if df.empty:
@@ -474,8 +656,6 @@ class EmployeeCleanupTool:
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to parse file:\n{str(e)}\n\nPlease ensure your file:\n• Is a valid CSV, XLS, or XLSX file\n• Contains column headers in the first row\n• Is not corrupted or password-protected")
-        finally:
-            self.root.config(cursor="")
             
     def show_preview_section(self):
         """Show data preview section"""
@@ -592,40 +772,26 @@ class EmployeeCleanupTool:
         table_container = tk.Frame(self.preview_table_frame, bg="white")
         table_container.pack(fill="both", expand=True)
         
-        # Add scrollbars
-        x_scroll = ttk.Scrollbar(table_container, orient="horizontal")
-        y_scroll = ttk.Scrollbar(table_container, orient="vertical")
+        # The preview is read-only, so the first 100 rows are rendered as one block of text
+        # instead of a Treeview with a Tk item per row
+        preview = df.head(100)
+        preview.index = preview.index + 1
+        preview_text = preview.to_string(index=True, max_colwidth=30)
         
-        # Create treeview
-        columns = list(df.columns)
-        tree = ttk.Treeview(
+        text_grid = scrolledtext.ScrolledText(
             table_container,
-            columns=columns,
-            show="tree headings",
-            xscrollcommand=x_scroll.set,
-            yscrollcommand=y_scroll.set,
+            wrap="none",
+            font=("Consolas", 9),
             height=15
         )
+        x_scroll = ttk.Scrollbar(table_container, orient="horizontal", command=text_grid.xview)
+        text_grid.config(xscrollcommand=x_scroll.set)
         
-        x_scroll.config(command=tree.xview)
-        y_scroll.config(command=tree.yview)
-        
-        # Configure columns
-        tree.column("#0", width=50, minwidth=50)
-        tree.heading("#0", text="Row")
+        text_grid.insert("1.0", preview_text)
+        text_grid.config(state="disabled")
         
-        for col in columns:
-            tree.column(col, width=150, minwidth=100)
-            tree.heading(col, text=str(col), command=lambda c=col: self.sort_treeview(tree, c, False))
-            
-        # Add data (first 100 rows for performance)
-        for idx, row in df.head(100).iterrows():
-            values = [str(val) for val in row]
-            tree.insert("", "end", text=str(idx + 1), values=values)
-            
         # Pack elements
-        tree.grid(row=0, column=0, sticky="nsew")
-        y_scroll.grid(row=0, column=1, sticky="ns")
+        text_grid.grid(row=0, column=0, sticky="nsew")
         x_scroll.grid(row=1, column=0, sticky="ew")
         
         table_container.grid_rowconfigure(0, weight=1)
@@ -827,10 +993,6 @@ class EmployeeCleanupTool:
         self.threshold = int(float(value))
         if hasattr(self, 'threshold_label'):
             self.threshold_label.config(text=f"{self.threshold}%")
-        
-        # Update the slider value if it exists
-        if hasattr(self, 'threshold_slider'):
-            self.threshold_slider.set(self.threshold)
     
     def set_threshold(self, value):
         """Set threshold programmatically"""
@@ -855,8 +1017,6 @@ class EmployeeCleanupTool:
     
     def test_threshold(self, name1, name2):
         """Test fuzzy matching with current threshold"""
-        from fuzzywuzzy import fuzz
-        
         # Clean names (same as in the application)
         name1_clean = str(name1).strip().lower()
         name2_clean = str(name2).strip().lower()
@@ -864,9 +1024,9 @@ class EmployeeCleanupTool:
         # Check exact match first
         exact_match = name1_clean == name2_clean
         
-        # Calculate similarity scores
-        score = fuzz.ratio(name1_clean, name2_clean)
-        partial_score = fuzz.partial_ratio(name1_clean, name2_clean)
+        # Calculate similarity scores (rounded to whole percentages)
+        score = round(fuzz.ratio(name1_clean, name2_clean))
+        partial_score = round(fuzz.partial_ratio(name1_clean, name2_clean))
         final_score = max(score, partial_score)
         
         # Check if it would match (only if fuzzy logic is enabled)
@@ -905,80 +1065,126 @@ class EmployeeCleanupTool:
         self.progress_bar['value'] = 0
         self.status_label.config(text="Starting clean-up process...")
         
-        # Run in separate thread to avoid freezing UI
-        thread = threading.Thread(target=self.cleanup_worker)
-        thread.daemon = True
-        thread.start()
+        # Run in separate thread to avoid freezing UI; the worker never touches Tk widgets,
+        # it posts progress messages that the main thread picks up in drain_progress_queue
+        self.progress_queue = queue.Queue()
+        self.user_subsets.clear()
+        self.cleanup_thread = threading.Thread(target=self.cleanup_worker, daemon=True)
+        self.cleanup_thread.start()
+        self.root.after(self.PROGRESS_POLL_MS, self.drain_progress_queue)
+    
+    def drain_progress_queue(self):
+        """Apply pending cleanup worker messages to the UI (runs on the Tk main thread)"""
+        progress = None
+        finished = None
+        while True:
+            try:
+                message = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if message[0] == 'progress':
+                # Only the latest progress update needs to be drawn
+                progress = message
+            else:
+                finished = message
+        
+        if progress is not None:
+            _, value, status = progress
+            self.progress_bar.config(value=value)
+            self.status_label.config(text=status)
+        
+        if finished is None:
+            self.root.after(self.PROGRESS_POLL_MS, self.drain_progress_queue)
+        elif finished[0] == 'done':
+            # Show results
+            self.root.after(500, self.show_results_section)
+        else:
+            messagebox.showerror("Error", f"Cleanup failed:\n{finished[1]}")
+            self.run_btn.config(state="normal")
         
     def detect_lookup_columns(self):
         """Automatically detect columns for lookup with flexible matching"""
+        current_df = self.uploaded_files['current_system']
+        previous_df = self.uploaded_files['previous_reference']
+        
+        # Lowercase column names once per frame for the keyword checks below
+        current_columns = self.columns_with_lowercase(current_df)
+        previous_columns = self.columns_with_lowercase(previous_df)
         
         # Current System - User ID column
         user_id_current = None
-        if self.uploaded_files['current_system'] is not None:
+        if current_df is not None:
             # Try exact match first
-            exact_match = [col for col in self.uploaded_files['current_system'].columns if col == 'User ID']
+            exact_match = [col for col in current_df.columns if col == 'User ID']
             if exact_match:
                 user_id_current = exact_match[0]
             else:
                 # Try flexible matching
-                flexible_match = [col for col in self.uploaded_files['current_system'].columns 
-                                 if any(keyword in str(col).lower() for keyword in ['user', 'id', 'sysid', 'username'])]
+                flexible_match = [col for col, col_lower in current_columns if self.USER_ID_PATTERN.search(col_lower)]
                 if flexible_match:
                     user_id_current = flexible_match[0]
         
         # Previous Reference - User ID column
         user_id_previous = None
-        if self.uploaded_files['previous_reference'] is not None:
+        if previous_df is not None:
             # Try exact match first
-            exact_match = [col for col in self.uploaded_files['previous_reference'].columns if col == 'User ID']
+            exact_match = [col for col in previous_df.columns if col == 'User ID']
             if exact_match:
                 user_id_previous = exact_match[0]
             else:
                 # Try flexible matching
-                flexible_match = [col for col in self.uploaded_files['previous_reference'].columns 
-                                 if any(keyword in str(col).lower() for keyword in ['user', 'id', 'sysid', 'username'])]
+                flexible_match = [col for col, col_lower in previous_columns if self.USER_ID_PATTERN.search(col_lower)]
                 if flexible_match:
                     user_id_previous = flexible_match[0]
         
         # Previous Reference - PERNR column
         pernr_previous = None
-        if self.uploaded_files['previous_reference'] is not None:
+        if previous_df is not None:
             # Try exact match first
-            exact_match = [col for col in self.uploaded_files['previous_reference'].columns if col == 'PERNR']
+            exact_match = [col for col in previous_df.columns if col == 'PERNR']
             if exact_match:
                 pernr_previous = exact_match[0]
             else:
                 # Try flexible matching
-                flexible_match = [col for col in self.uploaded_files['previous_reference'].columns 
-                                 if str(col).upper() == 'PERNR' or ('employee' in str(col).lower() and 'number' in str(col).lower())]
+                flexible_match = [col for col, col_lower in previous_columns
+                                 if col_lower == 'pernr' or ('employee' in col_lower and 'number' in col_lower)]
                 if flexible_match:
                     pernr_previous = flexible_match[0]
         
         return user_id_current, user_id_previous, pernr_previous
     
+    def columns_with_lowercase(self, df: Optional[pd.DataFrame]) -> List[Tuple[str, str]]:
+        """List of (column, lowercase column name) pairs, empty if there is no DataFrame"""
+        if df is None:
+            return []
+        return [(col, str(col).lower()) for col in df.columns]
+    
     def cleanup_worker(self):
         """Worker thread for cleanup process"""
         try:
-            # Get data
+            # Get data; only current_df gets new columns, so the reference frames are used
+            # as-is rather than copied
             current_df = self.uploaded_files['current_system'].copy()
-            previous_df = self.uploaded_files['previous_reference'].copy() if self.uploaded_files['previous_reference'] is not None else None
-            masterlist_current_df = self.uploaded_files['masterlist_current'].copy() if self.uploaded_files['masterlist_current'] is not None else None
-            masterlist_resigned_df = self.uploaded_files['masterlist_resigned'].copy() if self.uploaded_files['masterlist_resigned'] is not None else None
+            previous_df = self.uploaded_files['previous_reference']
+            masterlist_current_df = self.uploaded_files['masterlist_current']
+            masterlist_resigned_df = self.uploaded_files['masterlist_resigned']
             
             self.update_progress(10, "Loading and validating data...")
             
-            # Initialize new columns
-            current_df['PERNR'] = None
-            current_df['Full Name (From Masterlist)'] = None
-            current_df['Resignation Date'] = None
-            current_df['Position Name'] = None
-            current_df['Segment Name'] = None
-            current_df['Group Name'] = None
-            current_df['Area/Division Name'] = None
-            current_df['Department/Branch'] = None
-            current_df['Match Type'] = None  # Track how PERNR was found
-            current_df['Match Score'] = None  # Track fuzzy match score
+            # New columns, collected as plain lists and added to current_df in one step
+            new_columns = {
+                'PERNR': [],
+                'Full Name (From Masterlist)': [],
+                'Resignation Date': [],
+                'Position Name': [],
+                'Segment Name': [],
+                'Group Name': [],
+                'Area/Division Name': [],
+                'Department/Branch': [],
+                'Match Type': [],  # Track how PERNR was found
+                'Match Score': []  # Track fuzzy match score
+            }
             
             fuzzy_status = "with fuzzy matching" if self.use_fuzzy_logic else "exact matching only"
             self.update_progress(20, f"Looking up PERNRs, Full Names, Resignation Dates, and Organizational Data (User ID lookup + Name fallback {fuzzy_status})...")
@@ -986,235 +1192,192 @@ class EmployeeCleanupTool:
             # Detect columns for lookup once (outside the loop for performance)
             user_id_current, user_id_previous, pernr_previous = self.detect_lookup_columns()
             
-            # Process each row to add PERNR, Full Name, Resignation Date, and Organizational Data
-            for idx, row in current_df.iterrows():
-                employee_number = None
-                full_name = None
-                match_type = "no_match"  # Initialize match tracking
-                match_score = 0.0
-                
-                # Step 1: Lookup PERNR by User ID from previous_reference
-                # This is the primary lookup method with flexible column detection
-                if previous_df is not None and user_id_current and user_id_previous and pernr_previous:
-                    user_id = row.get(user_id_current)
-                    if pd.notna(user_id):
-                        match = previous_df[previous_df[user_id_previous] == user_id]
-                        if not match.empty:
-                            # Handle all types of PERNR values (numeric, text, special formats)
-                            pernr_value = match.iloc[0][pernr_previous]
-                            
-                            # Check if PERNR is valid (not "cant find", "unknown", etc.)
-                            if self.is_valid_pernr(pernr_value):
-                                # Convert to string and clean up whitespace
-                                pernr_str = str(pernr_value).strip()
-                                
-                                # Return the PERNR as-is if it has any content
-                                # This includes values like "SAMU-  ", "generic", numeric values, etc.
-                                employee_number = pernr_str if pernr_str else None
-                                
-                                if employee_number is not None:
-                                    match_type = "user_id_match"  # Track User ID match
-                                    match_score = 100.0
-                            # If PERNR is invalid (like "cant find"), employee_number remains None
-                            # and will trigger name matching fallback
+            # Step 1 lookup table: User ID -> PERNR from previous_reference (first row wins),
+            # probed for all rows at once instead of filtering previous_df per row
+            user_id_pernrs = [None] * len(current_df)
+            if previous_df is not None and user_id_current and user_id_previous and pernr_previous:
+                first_rows = previous_df.dropna(subset=[user_id_previous]).drop_duplicates(user_id_previous)
+                pernr_by_user_id = dict(zip(first_rows[user_id_previous], first_rows[pernr_previous]))
+                user_id_pernrs = current_df[user_id_current].map(pernr_by_user_id).tolist()
+            
+            # Name column used for the fallback lookup (new output columns are not candidates)
+            name_columns_current = [col for col, col_lower in self.columns_with_lowercase(self.uploaded_files['current_system'])
+                                    if 'username' in col_lower or 'name' in col_lower]
+            name_col_current = name_columns_current[0] if name_columns_current else None
+            
+            # Lookups keyed by integer PERNR, applied to all found PERNRs after the row loop:
+            # masterlist_current Full Name (Series) and organizational data (table for one join)
+            current_full_names = None
+            org_lookup = None
+            if masterlist_current_df is not None:
+                # Check for PERNR column first, then "Pers. Number"
+                pernr_col = None
+                if 'PERNR' in masterlist_current_df.columns:
+                    pernr_col = 'PERNR'
+                elif 'Pers. Number' in masterlist_current_df.columns:
+                    pernr_col = 'Pers. Number'
                 
-                # Step 2: Fallback lookup using name matching if User ID lookup failed
-                # Priority: 1) Exact name match, 2) Fuzzy matching (if exact fails)
-                # This finds PERNR by comparing "Username (Full Name)" with "Full Name" from masterlists
-                # Order: Current masterlist first, then resigned masterlist
-                if employee_number is None:
-                    # Get the current system's username/full name for comparison
-                    current_name = None
-                    name_columns_current = [col for col in current_df.columns if 'username' in str(col).lower() or 'name' in str(col).lower()]
-                    if name_columns_current:
-                        current_name = row.get(name_columns_current[0])
+                if pernr_col is not None:
+                    current_columns = self.columns_with_lowercase(masterlist_current_df)
+                    
+                    # Check for Full Name column - prioritize exact "Full Name" match
+                    name_columns = [col for col in masterlist_current_df.columns if col == 'Full Name']
+                    if not name_columns:
+                        # Fallback to flexible matching (could be "Name", "Employee Name", etc.)
+                        name_columns = [col for col, col_lower in current_columns if 'name' in col_lower]
+                    if name_columns:
+                        current_full_names = self.build_pernr_lookup(masterlist_current_df[pernr_col],
+                                                                     masterlist_current_df[name_columns[0]])
                     
-                    if current_name and pd.notna(current_name):
-                        # Try to find matching employee in masterlist_current
-                        if masterlist_current_df is not None:
-                            employee_number, full_name, match_type, match_score = self.find_employee_by_name(
-                                current_name, masterlist_current_df, "current"
-                            )
+                    # Find organizational columns
+                    org_values = {}
+                    for target_col, pattern in self.ORG_COLUMN_PATTERNS.items():
+                        # Find matching column in masterlist
+                        matching_cols = [col for col, col_lower in current_columns if pattern.search(col_lower)]
                         
-                        # If not found in current, try masterlist_resigned
-                        if employee_number is None and masterlist_resigned_df is not None:
-                            employee_number, full_name, match_type, match_score = self.find_employee_by_name(
-                                current_name, masterlist_resigned_df, "resigned"
-                            )
+                        if matching_cols:
+                            # Use the first matching column found, with values as text (None if empty)
+                            org_values[target_col] = [str(value) if pd.notna(value) else None
+                                                      for value in masterlist_current_df[matching_cols[0]]]
+                    
+                    if org_values:
+                        org_lookup = pd.DataFrame(org_values, dtype=object)
+                        org_lookup['PERNR Key'] = pd.to_numeric(masterlist_current_df[pernr_col], errors='coerce').astype('Int64').to_numpy()
+                        # First row wins for duplicated PERNRs, so the join is many-to-one
+                        org_lookup = org_lookup.dropna(subset=['PERNR Key']).drop_duplicates('PERNR Key')
+            
+            # Lookups keyed by integer PERNR for masterlist_resigned (Full Name and resignation date)
+            resigned_full_names = None
+            resigned_dates = None
+            if masterlist_resigned_df is not None and 'PERNR' in masterlist_resigned_df.columns:
+                resigned_columns = self.columns_with_lowercase(masterlist_resigned_df)
+                name_columns = [col for col, col_lower in resigned_columns if 'name' in col_lower]
+                if name_columns:
+                    resigned_full_names = self.build_pernr_lookup(masterlist_resigned_df['PERNR'],
+                                                                  masterlist_resigned_df[name_columns[0]])
                 
-                # Step 3: If PERNR was found but Full Name is still missing, lookup Full Name from masterlists
-                # This ensures we get the full name from the masterlist based on the PERNR
-                if employee_number is not None and full_name is None:
-                    # Debug: This indicates we found PERNR but not Full Name from name matching
-                    # Convert employee_number to integer for proper comparison
-                    emp_num_numeric = pd.to_numeric(employee_number, errors='coerce')
-                    if pd.notna(emp_num_numeric):
-                        emp_num_numeric = int(emp_num_numeric)
+                # Find resignation date column (could be "Resignation Date", "Date", "End Date", etc.)
+                date_columns = [col for col, col_lower in resigned_columns if self.RESIGNATION_DATE_PATTERN.search(col_lower)]
+                if date_columns:
+                    resigned_dates = self.build_pernr_lookup(masterlist_resigned_df['PERNR'],
+                                                             masterlist_resigned_df[date_columns[0]])
+            
+            # Step 1: PERNR found by User ID from previous_reference
+            # Invalid PERNRs (like "cant find", "unknown", etc.) are dropped and trigger the name
+            # matching fallback; valid ones are kept as-is once whitespace is stripped
+            # This includes values like "SAMU-  ", "generic", numeric values, etc.
+            user_id_numbers = [str(pernr_value).strip() if self.is_valid_pernr(pernr_value) else None
+                               for pernr_value in user_id_pernrs]
+            
+            # Step 2: Fallback lookup using name matching for rows whose User ID lookup failed
+            # Priority: 1) Exact name match, 2) Fuzzy matching (if exact fails)
+            # This finds PERNR by comparing "Username (Full Name)" with "Full Name" from masterlists
+            # Order: Current masterlist first, then resigned masterlist for the names still unmatched
+            # All pending names are matched against a masterlist in one batch; a masterlist's
+            # name lookup is only built once some name is left to match against it
+            name_matches = {}
+            if name_col_current is not None:
+                current_names = current_df[name_col_current].tolist()
+                pending = [position for position, (employee_number, current_name) in enumerate(zip(user_id_numbers, current_names))
+                           if employee_number is None and current_name and pd.notna(current_name)]
+                
+                for step, (masterlist_df, list_type) in enumerate(((masterlist_current_df, "current"),
+                                                                   (masterlist_resigned_df, "resigned"))):
+                    if masterlist_df is None or not pending:
+                        continue
                     
-                    # Try masterlist_current first
-                    pernr_col = None
-                    if masterlist_current_df is not None:
-                        # Check for PERNR column first, then "Pers. Number"
-                        if 'PERNR' in masterlist_current_df.columns:
-                            pernr_col = 'PERNR'
-                        elif 'Pers. Number' in masterlist_current_df.columns:
-                            pernr_col = 'Pers. Number'
+                    # Fuzzy matching reports its progress per scored batch, each masterlist
+                    # taking half of the 20-80% range
+                    def report_progress(scored: int, total: int):
+                        self.update_progress(20 + (step + scored / total) * 30,
+                                             f"Matching names against the {list_type} masterlist: {scored} of {total}...")
                     
-                    if pernr_col is not None:
-                        # Check for Full Name column - prioritize exact "Full Name" match
-                        name_columns = [col for col in masterlist_current_df.columns if col == 'Full Name']
-                        if not name_columns:
-                            # Fallback to flexible matching (could be "Name", "Employee Name", etc.)
-                            name_columns = [col for col in masterlist_current_df.columns if 'name' in str(col).lower()]
-                        if name_columns:
-                            # Convert masterlist PERNR to integer for comparison
-                            masterlist_current_df_copy = masterlist_current_df.copy()
-                            masterlist_current_df_copy[pernr_col] = pd.to_numeric(masterlist_current_df_copy[pernr_col], errors='coerce')
-                            masterlist_current_df_copy[pernr_col] = masterlist_current_df_copy[pernr_col].astype('Int64')
-                            match = masterlist_current_df_copy[masterlist_current_df_copy[pernr_col] == emp_num_numeric]
-                            if not match.empty:
-                                # Get the original index to retrieve the full name from original dataframe
-                                original_idx = match.index[0]
-                                full_name = masterlist_current_df.loc[original_idx, name_columns[0]]
+                    results = self.find_employees_by_name([current_names[position] for position in pending],
+                                                          masterlist_df, list_type, report_progress)
+                    name_matches.update(zip(pending, results))
                     
                     # If not found in current, try masterlist_resigned
-                    if full_name is None and masterlist_resigned_df is not None and 'PERNR' in masterlist_resigned_df.columns:
-                        name_columns = [col for col in masterlist_resigned_df.columns if 'name' in str(col).lower()]
-                        if name_columns:
-                            # Convert masterlist PERNR to integer for comparison
-                            masterlist_resigned_df_copy = masterlist_resigned_df.copy()
-                            masterlist_resigned_df_copy['PERNR'] = pd.to_numeric(masterlist_resigned_df_copy['PERNR'], errors='coerce')
-                            masterlist_resigned_df_copy['PERNR'] = masterlist_resigned_df_copy['PERNR'].astype('Int64')
-                            match = masterlist_resigned_df_copy[masterlist_resigned_df_copy['PERNR'] == emp_num_numeric]
-                            if not match.empty:
-                                # Get the original index to retrieve the full name from original dataframe
-                                original_idx = match.index[0]
-                                full_name = masterlist_resigned_df.loc[original_idx, name_columns[0]]
+                    pending = [position for position, result in zip(pending, results) if result[0] is None]
+            
+            # Process each row to record the PERNR and how it was found
+            progress_every = max(1, len(current_df) // self.PROGRESS_UPDATES)
+            for position in range(len(current_df)):
+                employee_number = user_id_numbers[position]
+                full_name = None
+                match_type = "no_match"  # Initialize match tracking
+                match_score = 0.0
                 
-                # Step 4: Lookup Resignation Date from resigned employee list if PERNR was found
-                resignation_date = None
-                if employee_number is not None and masterlist_resigned_df is not None and 'PERNR' in masterlist_resigned_df.columns:
-                    # Convert employee_number to integer for proper comparison
-                    emp_num_numeric = pd.to_numeric(employee_number, errors='coerce')
-                    if pd.notna(emp_num_numeric):
-                        emp_num_numeric = int(emp_num_numeric)
-                        
-                        # Convert masterlist PERNR to integer for comparison
-                        masterlist_resigned_df_copy = masterlist_resigned_df.copy()
-                        masterlist_resigned_df_copy['PERNR'] = pd.to_numeric(masterlist_resigned_df_copy['PERNR'], errors='coerce')
-                        masterlist_resigned_df_copy['PERNR'] = masterlist_resigned_df_copy['PERNR'].astype('Int64')
-                        match = masterlist_resigned_df_copy[masterlist_resigned_df_copy['PERNR'] == emp_num_numeric]
-                        
-                        if not match.empty:
-                            # Find resignation date column (could be "Resignation Date", "Date", "End Date", etc.)
-                            date_columns = [col for col in masterlist_resigned_df.columns if any(keyword in str(col).lower() for keyword in ['resignation', 'date', 'end', 'termination', 'exit', 'effectivity', 'separation', 'report'])]
-                            if date_columns:
-                                # Get the original index to retrieve the resignation date from original dataframe
-                                original_idx = match.index[0]
-                                raw_date = masterlist_resigned_df.loc[original_idx, date_columns[0]]
-                                
-                                # Format the date to short date format
-                                if pd.notna(raw_date):
-                                    try:
-                                        # Try to parse the date and format it as MM/DD/YYYY
-                                        if isinstance(raw_date, str):
-                                            # Handle string dates
-                                            parsed_date = pd.to_datetime(raw_date, errors='coerce')
-                                        else:
-                                            # Handle datetime objects
-                                            parsed_date = pd.to_datetime(raw_date, errors='coerce')
-                                        
-                                        if pd.notna(parsed_date):
-                                            resignation_date = parsed_date.strftime('%m/%d/%Y')
-                                        else:
-                                            resignation_date = None
-                                    except:
-                                        # If date parsing fails, keep original value
-                                        resignation_date = str(raw_date) if raw_date else None
-                                else:
-                                    resignation_date = None
+                if employee_number is not None:
+                    match_type = "user_id_match"  # Track User ID match
+                    match_score = 100.0
+                elif position in name_matches:
+                    employee_number, full_name, match_type, match_score = name_matches[position]
                 
-                # Step 5: Lookup Organizational Data from current employee list if PERNR was found
-                position_name = None
-                segment_name = None
-                group_name = None
-                area_division_name = None
-                department_branch = None
+                # Record all found data (or leave as None)
+                new_columns['PERNR'].append(employee_number)
+                new_columns['Full Name (From Masterlist)'].append(full_name)
                 
-                # Check for PERNR or "Pers. Number" column
-                pernr_col_org = None
-                if employee_number is not None and masterlist_current_df is not None:
-                    if 'PERNR' in masterlist_current_df.columns:
-                        pernr_col_org = 'PERNR'
-                    elif 'Pers. Number' in masterlist_current_df.columns:
-                        pernr_col_org = 'Pers. Number'
+                # Track match type and score
+                found = employee_number is not None
+                new_columns['Match Type'].append(match_type if found else None)
+                new_columns['Match Score'].append(match_score if found else None)
                 
-                if pernr_col_org is not None:
-                    # Convert employee_number to integer for proper comparison
-                    emp_num_numeric = pd.to_numeric(employee_number, errors='coerce')
-                    if pd.notna(emp_num_numeric):
-                        emp_num_numeric = int(emp_num_numeric)
-                        
-                        # Convert masterlist PERNR to integer for comparison
-                        masterlist_current_df_copy = masterlist_current_df.copy()
-                        masterlist_current_df_copy[pernr_col_org] = pd.to_numeric(masterlist_current_df_copy[pernr_col_org], errors='coerce')
-                        masterlist_current_df_copy[pernr_col_org] = masterlist_current_df_copy[pernr_col_org].astype('Int64')
-                        match = masterlist_current_df_copy[masterlist_current_df_copy[pernr_col_org] == emp_num_numeric]
-                        
-                        if not match.empty:
-                            # Get the original index to retrieve organizational data from original dataframe
-                            original_idx = match.index[0]
-                            
-                            # Find and retrieve organizational columns
-                            org_columns = {
-                                'Position Name': ['position', 'job', 'title', 'role', 'pos. name'],
-                                'Segment Name': ['segment'],
-                                'Group Name': ['group'],
-                                'Area/Division Name': ['area', 'division'],
-                                'Department/Branch': ['department', 'branch', 'unit']
-                            }
-                            
-                            for target_col, keywords in org_columns.items():
-                                # Find matching column in masterlist
-                                matching_cols = [col for col in masterlist_current_df.columns 
-                                               if any(keyword in str(col).lower() for keyword in keywords)]
-                                
-                                if matching_cols:
-                                    # Use the first matching column found
-                                    value = masterlist_current_df.loc[original_idx, matching_cols[0]]
-                                    if pd.notna(value):
-                                        if target_col == 'Position Name':
-                                            position_name = str(value)
-                                        elif target_col == 'Segment Name':
-                                            segment_name = str(value)
-                                        elif target_col == 'Group Name':
-                                            group_name = str(value)
-                                        elif target_col == 'Area/Division Name':
-                                            area_division_name = str(value)
-                                        elif target_col == 'Department/Branch':
-                                            department_branch = str(value)
+                # Update progress (at most PROGRESS_UPDATES times over the whole loop)
+                if position % progress_every == 0 or position == len(current_df) - 1:
+                    progress = 80 + (position / len(current_df)) * 10
+                    self.update_progress(progress, f"Processing row {position + 1} of {len(current_df)}...")
+            
+            # Convert found PERNRs to integers (truncated) for the masterlist PERNR lookups;
+            # text PERNRs like "SAMU-  " have no key
+            pernr_numbers = pd.to_numeric(pd.Series(new_columns['PERNR'], dtype=object), errors='coerce').astype('float64')
+            pernr_keys = np.trunc(pernr_numbers.where(np.isfinite(pernr_numbers))).astype('Int64')
+            
+            # Step 3: If PERNR was found but Full Name is still missing, lookup Full Name from masterlists
+            # This ensures we get the full name from the masterlist based on the PERNR
+            full_names = pd.Series(new_columns['Full Name (From Masterlist)'], dtype=object)
+            needs_full_name = pernr_keys.notna() & full_names.isna()
+            for full_name_lookup in (current_full_names, resigned_full_names):
+                # Try masterlist_current first, then masterlist_resigned for PERNRs not in current
+                if full_name_lookup is None:
+                    continue
+                in_lookup = needs_full_name & pernr_keys.isin(full_name_lookup.index)
+                full_names[in_lookup] = pernr_keys[in_lookup].map(full_name_lookup)
+                needs_full_name &= ~in_lookup
+            new_columns['Full Name (From Masterlist)'] = full_names.tolist()
+            
+            # Step 4: Lookup Resignation Date from resigned employee list if PERNR was found
+            if resigned_dates is not None:
+                in_resigned = pernr_keys.isin(resigned_dates.index)
+                raw_dates = pernr_keys[in_resigned].map(resigned_dates)
                 
-                # Assign all found data (or leave as None)
-                current_df.at[idx, 'PERNR'] = employee_number
-                current_df.at[idx, 'Full Name (From Masterlist)'] = full_name
-                current_df.at[idx, 'Resignation Date'] = resignation_date
-                current_df.at[idx, 'Position Name'] = position_name
-                current_df.at[idx, 'Segment Name'] = segment_name
-                current_df.at[idx, 'Group Name'] = group_name
-                current_df.at[idx, 'Area/Division Name'] = area_division_name
-                current_df.at[idx, 'Department/Branch'] = department_branch
+                # Format each distinct value once (most employees share a handful of dates and status values)
+                formatted = {value: self.format_resignation_date(value) for value in raw_dates.dropna().unique()}
                 
-                # Track match type and score
-                if employee_number is not None:
-                    current_df.at[idx, 'Match Type'] = match_type
-                    current_df.at[idx, 'Match Score'] = match_score
-                
-                # Update progress
-                progress = 20 + (idx / len(current_df)) * 70
-                self.update_progress(progress, f"Processing row {idx + 1} of {len(current_df)}...")
+                # Rows without a date (PERNR not resigned, missing raw date, or a value formatted to
+                # None) hold None, not NaN
+                resignation_dates = raw_dates.map(formatted).reindex(pernr_keys.index).astype(object)
+                new_columns['Resignation Date'] = resignation_dates.where(resignation_dates.notna(), None).tolist()
+            else:
+                new_columns['Resignation Date'] = [None] * len(current_df)
+            
+            # Step 5: Lookup Organizational Data from current employee list for every found PERNR
+            # in one left join (many report rows can share a PERNR; each PERNR appears once in org_lookup)
+            org_data = None
+            if org_lookup is not None:
+                found_pernrs = pd.DataFrame({'PERNR Key': pernr_keys})
+                org_data = found_pernrs.merge(org_lookup, on='PERNR Key', how='left', validate='m:1')
+            for target_col in self.ORG_COLUMN_PATTERNS:
+                if org_data is not None and target_col in org_data.columns:
+                    values = org_data[target_col]
+                    new_columns[target_col] = values.where(values.notna(), None).tolist()
+                else:
+                    new_columns[target_col] = [None] * len(current_df)
             
             self.update_progress(95, "Generating clean reports...")
             
+            # Add all new columns at once (existing columns of the same name are replaced in place)
+            current_df[list(new_columns)] = pd.DataFrame(new_columns, index=current_df.index, dtype=object)
+            
             # Keep PERNR column as string to preserve all values including "SAMU-  ", "generic", etc.
             # Only convert numeric PERNRs to clean format, keep text values as-is
             def clean_pernr(pernr_value):
@@ -1237,8 +1400,9 @@ class EmployeeCleanupTool:
             
             current_df['PERNR'] = current_df['PERNR'].apply(clean_pernr)
             
-            # Store all data (both matched and unmatched) in cleaned_data
-            self.cleaned_data = current_df.copy()
+            # Store all data (both matched and unmatched) in cleaned_data; current_df is
+            # already this run's own copy, so it is stored without copying again
+            self.cleaned_data = current_df
             
             # Create separate unmatched data for review (records without PERNR)
             self.unmatched_data = current_df[current_df['PERNR'].isna()].copy()
@@ -1248,28 +1412,25 @@ class EmployeeCleanupTool:
             self.fuzzy_matched_data = current_df[fuzzy_matched_mask].copy()
             
             self.update_progress(100, "Clean-up completed successfully!")
-            
-            # Show results
-            self.root.after(500, self.show_results_section)
+            self.progress_queue.put(('done',))
             
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Cleanup failed:\n{str(e)}"))
-            self.root.after(0, lambda: self.run_btn.config(state="normal"))
+            self.progress_queue.put(('error', str(e)))
             
-    def find_employee_by_name(self, current_name: str, masterlist_df: pd.DataFrame, list_type: str) -> Tuple[Optional[str], Optional[str], str, float]:
+    def build_name_lookup(self, masterlist_df: pd.DataFrame) -> Optional[Dict]:
         """
-        Find employee by name using fuzzy matching
+        Build the name lookup used by find_employee_by_name for one masterlist
         
         Args:
-            current_name: Name from current system report (Username/Full Name)
             masterlist_df: Masterlist dataframe (current or resigned)
-            list_type: "current" or "resigned" for logging purposes
             
         Returns:
-            Tuple of (employee_number, full_name, match_type, match_score) or (None, None, "no_match", 0.0) if not found
+            Dict with 'exact' (cleaned name -> (employee_number, full_name), first row wins)
+            and 'choices' (list of (cleaned name, full_name, employee_number) for fuzzy matching),
+            or None if the masterlist has no usable name/PERNR columns
         """
         if masterlist_df is None or masterlist_df.empty:
-            return None, None, "no_match", 0.0
+            return None
         
         # Find name columns in masterlist - prioritize "Full Name" column
         name_columns = [col for col in masterlist_df.columns if col == 'Full Name']
@@ -1277,7 +1438,7 @@ class EmployeeCleanupTool:
             # Fallback to flexible matching (could be "Name", "Employee Name", etc.)
             name_columns = [col for col in masterlist_df.columns if 'name' in str(col).lower()]
         if not name_columns:
-            return None, None, "no_match", 0.0
+            return None
         
         # Find PERNR column - prioritize "PERNR" then "Pers. Number"
         emp_num_columns = [col for col in masterlist_df.columns if str(col).upper() == 'PERNR']
@@ -1288,160 +1449,291 @@ class EmployeeCleanupTool:
             # Fallback to old naming convention
             emp_num_columns = [col for col in masterlist_df.columns if 'employee' in str(col).lower() and 'number' in str(col).lower()]
         if not emp_num_columns:
-            return None, None, "no_match", 0.0
+            return None
         
         name_col = name_columns[0]  # Use first name column found
         emp_num_col = emp_num_columns[0]  # Use first PERNR column found
         
-        best_match = None
-        best_score = 0
-        best_employee_number = None
-        best_full_name = None
+        # Rows without a name can never match
+        has_name = masterlist_df[name_col].notna()
+        names = masterlist_df.loc[has_name, name_col]
+        
+        # Convert PERNRs to integer, stored as string for consistency
+        emp_nums = pd.to_numeric(masterlist_df.loc[has_name, emp_num_col], errors='coerce')
+        employee_numbers = [str(int(emp_num)) if pd.notna(emp_num) else None for emp_num in emp_nums]
         
-        # Clean the current name for comparison
-        current_name_clean = str(current_name).strip().lower()
+        # Clean all names once (stripped for display, lowercase for comparison)
+        masterlist_names = names.astype(self.STRING_DTYPE).str.strip()
+        masterlist_names_clean = masterlist_names.str.lower()
+        
+        exact = {}
+        choices = []
+        for name, masterlist_name, masterlist_name_clean, employee_number in zip(
+                names, masterlist_names, masterlist_names_clean, employee_numbers):
+            exact.setdefault(masterlist_name_clean, (employee_number, str(name)))
+            choices.append((masterlist_name_clean, masterlist_name, employee_number))
+        
+        return {'exact': exact, 'choices': choices}
+    
+    def build_pernr_lookup(self, pernr_column: pd.Series, values: pd.Series) -> pd.Series:
+        """
+        Index a masterlist column by integer PERNR for Series.map lookups
+        
+        Args:
+            pernr_column: PERNR column from a masterlist
+            values: Column of the same masterlist to look up
+            
+        Returns:
+            Series of values indexed by PERNR (first row wins, non-numeric PERNRs are skipped)
+        """
+        pernrs = pd.to_numeric(pernr_column, errors='coerce').astype('Int64')
+        lookup = pd.Series(values.to_numpy(dtype=object), index=pd.Index(pernrs))
+        lookup = lookup[lookup.index.notna()]
+        return lookup[~lookup.index.duplicated()]
+    
+    def format_resignation_date(self, raw_date) -> Optional[str]:
+        """Format a masterlist resignation date as MM/DD/YYYY (None if empty or not a date)"""
+        if pd.isna(raw_date):
+            return None
+        
+        try:
+            # Try to parse the date and format it as MM/DD/YYYY
+            parsed_date = pd.to_datetime(raw_date, errors='coerce')
+            
+            if pd.notna(parsed_date):
+                return parsed_date.strftime('%m/%d/%Y')
+            return None
+        except:
+            # If date parsing fails, keep original value
+            return str(raw_date) if raw_date else None
+    
+    def clean_names(self, names: List[str]) -> List[str]:
+        """
+        Normalize names for comparison (text, stripped, lowercase) in one vectorized pass
+        
+        Args:
+            names: Non-missing names (any values; non-text ones are converted to text)
+            
+        Returns:
+            Cleaned names, in the same order
+        """
+        return pd.Series(names, dtype=object).astype(self.STRING_DTYPE).str.strip().str.lower().tolist()
+    
+    def find_employee_by_name(self, current_name: str, masterlist_df: pd.DataFrame, list_type: str) -> Tuple[Optional[str], Optional[str], str, float]:
+        """
+        Find employee by name using fuzzy matching
+        
+        Args:
+            current_name: Name from current system report (Username/Full Name)
+            masterlist_df: Masterlist dataframe (current or resigned)
+            list_type: "current" or "resigned" for logging purposes
+            
+        Returns:
+            Tuple of (employee_number, full_name, match_type, match_score) or (None, None, "no_match", 0.0) if not found
+        """
+        return self.find_employees_by_name([current_name], masterlist_df, list_type)[0]
+    
+    def find_employees_by_name(self, current_names: List[str], masterlist_df: pd.DataFrame, list_type: str,
+                               progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Tuple[Optional[str], Optional[str], str, float]]:
+        """
+        Find employees for a batch of names using exact, then fuzzy matching
+        
+        Args:
+            current_names: Names from current system report (Username/Full Name)
+            masterlist_df: Masterlist dataframe (current or resigned)
+            list_type: "current" or "resigned" for logging purposes
+            progress_callback: Called with (names scored, names to score) after every fuzzy matching batch
+            
+        Returns:
+            List of (employee_number, full_name, match_type, match_score) tuples, one per name
+        """
+        no_match = (None, None, "no_match", 0.0)
+        name_lookup = self.build_name_lookup(masterlist_df)
+        if name_lookup is None:
+            return [no_match] * len(current_names)
+        
+        # Clean the current names for comparison
+        current_names_clean = self.clean_names(current_names)
         
         # PRIORITY 1: Try exact match first (case-insensitive)
         # This ensures we get the most accurate Employee Number when names match exactly
-        for idx, row in masterlist_df.iterrows():
-            masterlist_name = str(row[name_col]).strip().lower()
-            if pd.notna(row[name_col]) and current_name_clean == masterlist_name:
-                # Convert PERNR to integer, return as string for consistency
-                emp_num = pd.to_numeric(row[emp_num_col], errors='coerce')
-                return str(int(emp_num)) if pd.notna(emp_num) else None, str(row[name_col]), "exact_match", 100.0
+        results = []
+        fuzzy_positions = []
+        for position, current_name_clean in enumerate(current_names_clean):
+            exact_match = name_lookup['exact'].get(current_name_clean)
+            if exact_match is not None:
+                employee_number, full_name = exact_match
+                results.append((employee_number, full_name, "exact_match", 100.0))
+            else:
+                results.append(no_match)
+                fuzzy_positions.append(position)
         
         # PRIORITY 2: If no exact match, try fuzzy matching as fallback (if enabled)
         # Only use fuzzy logic when exact matching fails AND fuzzy logic is enabled
-        if not self.use_fuzzy_logic:
-            return None, None, "no_match", 0.0
-            
-        for idx, row in masterlist_df.iterrows():
-            if pd.isna(row[name_col]):
+        if not self.use_fuzzy_logic or not fuzzy_positions or not name_lookup['choices']:
+            return results
+        
+        # The same name often appears on several report rows; score each distinct name once
+        unique_queries = list(dict.fromkeys(current_names_clean[position] for position in fuzzy_positions))
+        best_by_query = dict(zip(unique_queries, self.best_fuzzy_matches(unique_queries, name_lookup['choices'],
+                                                                              progress_callback)))
+        for position in fuzzy_positions:
+            best_choice, best_score = best_by_query[current_names_clean[position]]
+            if best_choice is None:
                 continue
-                
-            masterlist_name = str(row[name_col]).strip()
-            masterlist_name_clean = masterlist_name.lower()
             
-            # Calculate similarity score
-            score = fuzz.ratio(current_name_clean, masterlist_name_clean)
+            _, masterlist_name, employee_number = name_lookup['choices'][best_choice]
+            if employee_number is not None:
+                results[position] = (employee_number, masterlist_name, "fuzzy_match", best_score)
+        
+        return results
+    
+    def best_fuzzy_matches(self, queries: List[str], choices: List[Tuple[str, str, Optional[str]]],
+                           progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Tuple[Optional[int], int]]:
+        """
+        Score cleaned names against masterlist choices and pick the best one for each
+        
+        The score for a pair is the higher of the ratio and partial ratio, rounded to a whole
+        percentage. Ties go to the first masterlist row, and scores below the threshold are
+        pruned inside RapidFuzz (score_cutoff) instead of being computed in full. Names are
+        scored in batches of SCORE_BLOCK_SIZE against CHOICE_BLOCK_SIZE choices at a time.
+        
+        Args:
+            queries: Cleaned (stripped, lowercase) names to match
+            choices: Masterlist choices from build_name_lookup
+            progress_callback: Called with (names scored, total names) after every batch
             
-            # Also try partial ratio for better matching
-            partial_score = fuzz.partial_ratio(current_name_clean, masterlist_name_clean)
+        Returns:
+            List of (choice position, score) per query; (None, 0) if nothing reached the threshold
+        """
+        choice_names = [choice[0] for choice in choices]
+        # Raw scores from threshold - 0.5 upwards round to the threshold or above
+        score_cutoff = max(self.threshold - 0.5, 0)
+        
+        best_matches = []
+        for start in range(0, len(queries), self.SCORE_BLOCK_SIZE):
+            block = queries[start:start + self.SCORE_BLOCK_SIZE]
+            best_scores = np.zeros(len(block))
+            best_choices = np.zeros(len(block), dtype=np.int64)
             
-            # Use the higher score
-            final_score = max(score, partial_score)
+            for choice_start in range(0, len(choice_names), self.CHOICE_BLOCK_SIZE):
+                choice_block = choice_names[choice_start:choice_start + self.CHOICE_BLOCK_SIZE]
+                # Names are already cleaned, so RapidFuzz does no preprocessing of its own.
+                # Scores are rounded in place with np.rint (halves to even): RapidFuzz's own
+                # integer dtypes round halves up, which would move scores across the threshold
+                scores = process.cdist(block, choice_block, scorer=fuzz.ratio, processor=None, dtype=np.float64,
+                                       score_cutoff=score_cutoff, workers=-1)
+                np.rint(scores, out=scores)
+                partial_scores = process.cdist(block, choice_block, scorer=fuzz.partial_ratio, processor=None,
+                                               dtype=np.float64, score_cutoff=score_cutoff, workers=-1)
+                np.maximum(scores, np.rint(partial_scores, out=partial_scores), out=scores)
+                
+                # Only a strictly better score replaces the best so far, so earlier rows win ties
+                block_choices = scores.argmax(axis=1)
+                block_scores = scores[np.arange(len(block)), block_choices]
+                better = block_scores > best_scores
+                best_scores[better] = block_scores[better]
+                best_choices[better] = block_choices[better] + choice_start
             
-            # Update best match if this is better
-            if final_score > best_score and final_score >= self.threshold:
-                best_score = final_score
-                best_match = masterlist_name
-                # Convert PERNR to integer, store as string for consistency
-                emp_num = pd.to_numeric(row[emp_num_col], errors='coerce')
-                best_employee_number = str(int(emp_num)) if pd.notna(emp_num) else None
-                best_full_name = masterlist_name
+            for best_choice, best_score in zip(best_choices.tolist(), best_scores.tolist()):
+                if best_score > 0 and best_score >= self.threshold:
+                    best_matches.append((best_choice, int(best_score)))
+                else:
+                    best_matches.append((None, 0))
+            
+            if progress_callback is not None:
+                progress_callback(start + len(block), len(queries))
         
-        if best_employee_number is not None:
-            return best_employee_number, best_full_name, "fuzzy_match", best_score
-        else:
-            return None, None, "no_match", 0.0
+        return best_matches
     
     def update_progress(self, value, status):
-        """Update progress bar and status"""
-        self.root.after(0, lambda: self.progress_bar.config(value=value))
-        self.root.after(0, lambda: self.status_label.config(text=status))
+        """Queue a progress bar and status update (safe to call from the cleanup worker thread)"""
+        self.progress_queue.put(('progress', value, status))
         
     def sort_treeview(self, tree, col, reverse):
         """Sort treeview by column"""
-        # Get all items
-        items = [(tree.set(child, col), child) for child in tree.get_children('')]
+        # Get all items, using the cell text cached at insert time when the tree has it
+        row_cells = getattr(tree, 'row_cells', None)
+        if row_cells is not None:
+            position = tree.row_columns.index(col)
+            items = [(row_cells[child][position], child) for child in tree.get_children('')]
+        else:
+            items = [(tree.set(child, col), child) for child in tree.get_children('')]
         
-        # Determine data type by analyzing column content
-        numeric_count = 0
-        date_count = 0
+        # Determine data type by analyzing column content, one vectorized pass per type
         total_count = len(items)
-        
-        for val, _ in items:
-            if val and val.strip():  # Skip empty values
-                # Check if value is numeric (including decimals and negative numbers)
-                try:
-                    float(val)
-                    numeric_count += 1
-                except ValueError:
-                    pass
-                
-                # Check if value is a date in MM/DD/YYYY format
-                if self.is_date_format(val):
-                    date_count += 1
-        
-        # Determine sorting method based on content analysis
+        values = pd.Series([val for val, _ in items], dtype=object)
+        numbers = pd.to_numeric(values, errors='coerce').astype('float64').to_numpy()
+        dates = self.date_sort_values(values).to_numpy()
+        numeric_count = int(np.isfinite(numbers).sum())
+        date_count = int(np.isfinite(dates).sum())
+        
+        # Content entries come first, sorted by value; blank and unparseable entries always go
+        # to the bottom; ties keep their current order
         if total_count > 0 and (date_count / total_count) > 0.5:
-            # Sort as dates (MM/DD/YYYY format)
-            def date_key(x):
-                val = x[0]
-                if not val or not val.strip():
-                    # Blank entries go to bottom for ascending, top for descending
-                    return (1, float('inf')) if not reverse else (0, float('-inf'))
-                
-                if self.is_date_format(val):
-                    try:
-                        # Parse MM/DD/YYYY format
-                        month, day, year = val.split('/')
-                        # Convert to sortable format (YYYYMMDD)
-                        date_value = int(year) * 10000 + int(month) * 100 + int(day)
-                        # Content entries get priority (0), then sorted by date
-                        return (0, date_value)
-                    except:
-                        # Invalid dates go to bottom
-                        return (1, float('inf')) if not reverse else (0, float('-inf'))
-                else:
-                    # Non-date values go to bottom
-                    return (1, float('inf')) if not reverse else (0, float('-inf'))
-            
-            items.sort(key=date_key, reverse=reverse)
-            
+            # Sort as dates (MM/DD/YYYY format, compared as YYYYMMDD)
+            order = self.order_with_blanks_last(dates, reverse)
         elif total_count > 0 and (numeric_count / total_count) > 0.7:
             # Sort as numbers
-            def numeric_key(x):
-                val = x[0]
-                if not val or not val.strip():
-                    # Blank entries go to bottom for ascending, top for descending
-                    return (1, float('inf')) if not reverse else (0, float('-inf'))
-                
-                try:
-                    num_value = float(val)
-                    # Content entries get priority (0), then sorted by number
-                    return (0, num_value)
-                except ValueError:
-                    # Non-numeric values go to bottom
-                    return (1, float('inf')) if not reverse else (0, float('-inf'))
-            
-            items.sort(key=numeric_key, reverse=reverse)
+            order = self.order_with_blanks_last(numbers, reverse)
         else:
             # Sort as strings (alphabetical)
-            def string_key(x):
-                val = x[0]
-                if not val or not val.strip():
-                    # Blank entries go to bottom for ascending, top for descending
-                    return (1, "zzz") if not reverse else (0, "")
-                
-                # Content entries get priority (0), then sorted alphabetically
-                return (0, val.lower())
-            
-            items.sort(key=string_key, reverse=reverse)
+            bottom = (1, "zzz") if not reverse else (0, "")
+            keys = [(0, val.lower()) if val and val.strip() else bottom for val, _ in items]
+            order = sorted(range(total_count), key=keys.__getitem__, reverse=reverse)
+        items = [items[position] for position in order]
         
-        # Rearrange items in sorted positions
-        for index, (val, child) in enumerate(items):
-            tree.move(child, '', index)
+        # Rearrange items in sorted positions (one Tk call for all rows)
+        tree.set_children('', *[child for _, child in items])
         
-        # Update column header to show sort direction
-        for c in tree['columns']:
-            if c == col:
-                tree.heading(c, text=f"{str(c)} {'↓' if reverse else '↑'}")
-            else:
-                tree.heading(c, text=str(c))
+        # Update column header to show sort direction; only the previously sorted column
+        # carries an arrow, so it is the only other header that needs resetting
+        previous_col = getattr(tree, 'sorted_column', None)
+        if previous_col is not None and previous_col != col:
+            tree.heading(previous_col, text=str(previous_col))
+        tree.sorted_column = col
         
         # Store sort state
-        tree.heading(col, command=lambda: self.sort_treeview(tree, col, not reverse))
+        tree.heading(col, text=f"{str(col)} {'↓' if reverse else '↑'}",
+                     command=lambda: self.sort_treeview(tree, col, not reverse))
+    
+    def order_with_blanks_last(self, sort_values: np.ndarray, reverse: bool) -> np.ndarray:
+        """
+        Stable sort order for numeric sort values, with non-finite (blank/unparseable) entries last
+        
+        Args:
+            sort_values: Float sort value per item (NaN where the item has none)
+            reverse: Sort descending instead of ascending
+            
+        Returns:
+            Item positions in sorted order
+        """
+        has_value = np.isfinite(sort_values)
+        positions = np.flatnonzero(has_value)
+        keys = -sort_values[positions] if reverse else sort_values[positions]
+        return np.concatenate([positions[np.argsort(keys, kind='stable')], np.flatnonzero(~has_value)])
+    
+    def date_sort_values(self, values: pd.Series) -> pd.Series:
+        """
+        Convert MM/DD/YYYY strings to YYYYMMDD numbers for sorting, column-wise
+        
+        Uses the same rules as is_date_format (surrounding whitespace ignored, month 1-12,
+        day 1-31, year 1900-2100).
+        
+        Args:
+            values: Cell values as strings
+            
+        Returns:
+            Float Series of YYYYMMDD values, NaN where the value is not a valid date
+        """
+        parts = values.str.strip().str.extract(self.DATE_PATTERN).dropna().astype('int64')
+        if parts.empty:
+            return pd.Series(np.nan, index=values.index)
+        
+        month, day, year = parts[0], parts[1], parts[2]
+        valid = month.between(1, 12) & day.between(1, 31) & year.between(1900, 2100)
+        date_values = (year * 10000 + month * 100 + day)[valid]
+        return date_values.reindex(values.index).astype('float64')
     
     def is_date_format(self, value):
         """Check if a value matches MM/DD/YYYY date format"""
@@ -1449,22 +1741,13 @@ class EmployeeCleanupTool:
             return False
         
         # Check for MM/DD/YYYY pattern
-        import re
-        date_pattern = r'^\d{1,2}/\d{1,2}/\d{4}$'
-        if re.match(date_pattern, value.strip()):
-            try:
-                # Validate the date components
-                parts = value.strip().split('/')
-                if len(parts) == 3:
-                    month, day, year = parts
-                    month, day, year = int(month), int(day), int(year)
-                    # Basic validation
-                    if 1 <= month <= 12 and 1 <= day <= 31 and 1900 <= year <= 2100:
-                        return True
-            except ValueError:
-                pass
+        match = self.DATE_PATTERN.match(value.strip())
+        if not match:
+            return False
         
-        return False
+        # Validate the date components (captured by the pattern, so always digits)
+        month, day, year = map(int, match.groups())
+        return 1 <= month <= 12 and 1 <= day <= 31 and 1900 <= year <= 2100
     
     def is_valid_pernr(self, pernr_value):
         """
@@ -1606,10 +1889,31 @@ class EmployeeCleanupTool:
         self.results_preview_frame = tk.Frame(preview_section, bg="white")
         self.results_preview_frame.pack(fill="both", expand=True)
         
+        # Let Tk draw the section first: the initial preview (up to 100 rows) and the export
+        # buttons are built once the event loop is idle (pack order still puts them below)
+        results_frame = self.results_frame
+        self.root.after_idle(lambda: self.build_deferred_results(results_frame, total, unmatched))
+    
+    def build_deferred_results(self, results_frame: tk.LabelFrame, total: int, unmatched: int):
+        """
+        Build the initial results preview and the export buttons (scheduled by show_results_section)
+        
+        Args:
+            results_frame: Results section the callback was scheduled for; nothing is built if it
+                has since been replaced or removed (re-run, clear all)
+            total: Number of records in the current system report
+            unmatched: Number of records without a PERNR
+        """
+        if results_frame is not self.results_frame:
+            return
+        
         # Show initial preview
         self.update_results_preview()
-            
-        # Export buttons
+        
+        self.build_export_buttons(total, unmatched)
+    
+    def build_export_buttons(self, total: int, unmatched: int):
+        """Build the export buttons below the results preview"""
         export_frame = tk.Frame(self.results_frame, bg="white")
         export_frame.pack(fill="x", pady=(0, 15))
         
@@ -1769,40 +2073,110 @@ class EmployeeCleanupTool:
             return
             
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Build a clearer default file name using the uploaded current system file as base
-        def build_initial_filename(suggested_label: str, ext: str) -> str:
-            # Try to base the file name on the uploaded Current System file name
-            base_name = "Report"
-            try:
-                if self.file_paths.get('current_system'):
-                    base_name = Path(self.file_paths['current_system']).stem
-            except Exception:
-                pass
-            # Sanitize
-            base_name = re.sub(r"[^A-Za-z0-9 _\-]", "", str(base_name)).strip()
-            label = suggested_label.replace("_", " ").title()
-            return f"{base_name} - {label} - {timestamp}.{ext}"
         
         if format_type == "excel":
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".xlsx",
-                initialfile=build_initial_filename(filename, "xlsx"),
+                initialfile=self.build_initial_filename(filename, "xlsx", timestamp),
                 filetypes=[("Excel files", "*.xlsx")]
             )
             if file_path:
-                df.to_excel(file_path, index=False)
+                try:
+                    self.write_excel(file_path, {'Sheet1': df})
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+                    return
                 messagebox.showinfo("Success", f"Data exported to:\n{file_path}")
         else:  # csv
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".csv",
-                initialfile=build_initial_filename(filename, "csv"),
+                initialfile=self.build_initial_filename(filename, "csv", timestamp),
                 filetypes=[("CSV files", "*.csv")]
             )
             if file_path:
-                df.to_csv(file_path, index=False)
+                try:
+                    df.to_csv(file_path, index=False)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+                    return
                 messagebox.showinfo("Success", f"Data exported to:\n{file_path}")
     
+    def build_initial_filename(self, suggested_label: str, ext: str, timestamp: str) -> str:
+        """
+        Build a clearer default export file name using the uploaded current system file as base
+        
+        Args:
+            suggested_label: Export label like "cleaned_report"
+            ext: File extension without the dot
+            timestamp: Export timestamp (YYYYMMDD_HHMMSS)
+            
+        Returns:
+            File name like "<current system file> - Cleaned Report - <timestamp>.xlsx"
+        """
+        # Try to base the file name on the uploaded Current System file name
+        base_name = "Report"
+        try:
+            if self.file_paths.get('current_system'):
+                base_name = Path(self.file_paths['current_system']).stem
+        except Exception:
+            pass
+        # Sanitize
+        base_name = self.FILENAME_UNSAFE_PATTERN.sub("", str(base_name)).strip()
+        label = suggested_label.replace("_", " ").title()
+        return f"{base_name} - {label} - {timestamp}.{ext}"
+    
+    def write_excel(self, file_path: str, sheets: Dict[str, pd.DataFrame]):
+        """
+        Write DataFrames to an Excel file, one sheet each in the given order
+        
+        Uses the Rust-backed writer when it is installed, which streams cell values instead of
+        building an openpyxl object for every cell; otherwise falls back to openpyxl. Both write
+        datetimes in pandas' default format.
+        
+        Args:
+            file_path: Destination .xlsx path
+            sheets: Sheet name -> DataFrame (written without the index)
+        """
+        if FastExcel is not None:
+            writer = FastExcel(file_path).format(datetime_format='yyyy-mm-dd hh:mm:ss')
+            for sheet_name, sheet_df in sheets.items():
+                writer.sheet(sheet_name, self.prepare_fast_excel_sheet(sheet_df))
+            writer.save()
+            return
+        
+        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+            for sheet_name, sheet_df in sheets.items():
+                sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
+    
+    def prepare_fast_excel_sheet(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adapt a sheet to what the Rust-backed writer accepts, without modifying the input
+        
+        The writer fails on NaT (it reads it as year 1) and only takes text headers, so datetime
+        columns with blank cells are handed over as objects with None (written as empty cells)
+        and non-text headers (e.g. a year) are written as text.
+        
+        Args:
+            df: Sheet to write
+            
+        Returns:
+            The same frame, or a shallow copy with the affected columns converted
+        """
+        prepared = df
+        for position, dtype in enumerate(df.dtypes):
+            if not is_datetime64_any_dtype(dtype):
+                continue
+            values = df.iloc[:, position]
+            if values.notna().all():
+                continue
+            if prepared is df:
+                prepared = df.copy(deep=False)
+            prepared.isetitem(position, values.astype(object).where(values.notna(), None))
+        
+        if not all(isinstance(col, str) for col in prepared.columns):
+            prepared = prepared.set_axis([str(col) for col in prepared.columns], axis=1)
+        return prepared
+    
     def export_cleaned_data_with_resigned(self, df: pd.DataFrame, filename: str, format_type: str):
         """Export cleaned data with additional resigned users sheet"""
         if df is None or df.empty:
@@ -1810,23 +2184,11 @@ class EmployeeCleanupTool:
             return
             
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Build a clearer default file name using the uploaded current system file as base
-        def build_initial_filename(suggested_label: str, ext: str) -> str:
-            base_name = "Report"
-            try:
-                if self.file_paths.get('current_system'):
-                    base_name = Path(self.file_paths['current_system']).stem
-            except Exception:
-                pass
-            base_name = re.sub(r"[^A-Za-z0-9 _\-]", "", str(base_name)).strip()
-            label = suggested_label.replace("_", " ").title()
-            return f"{base_name} - {label} - {timestamp}.{ext}"
         
         if format_type == "excel":
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".xlsx",
-                initialfile=build_initial_filename(filename, "xlsx"),
+                initialfile=self.build_initial_filename(filename, "xlsx", timestamp),
                 filetypes=[("Excel files", "*.xlsx")]
             )
             if file_path:
@@ -1836,36 +2198,31 @@ class EmployeeCleanupTool:
                 # Create current users dataframe (exclude resigned users)
                 current_users = self.get_current_users_data(df)
                 
-                # Export with multiple sheets
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    # Main cleaned data sheet
-                    df.to_excel(writer, sheet_name='Cleaned Data', index=False)
-                    
-                    # Resigned users sheet
-                    if not resigned_users.empty:
-                        resigned_users.to_excel(writer, sheet_name='Resigned Users', index=False)
-                    else:
-                        # Create empty sheet with headers if no resigned users
-                        empty_df = pd.DataFrame(columns=df.columns)
-                        empty_df.to_excel(writer, sheet_name='Resigned Users', index=False)
-                    
-                    # Current users sheet
-                    if not current_users.empty:
-                        current_users.to_excel(writer, sheet_name='Current Users', index=False)
-                    else:
-                        # Create empty sheet with headers if no current users
-                        empty_df = pd.DataFrame(columns=df.columns)
-                        empty_df.to_excel(writer, sheet_name='Current Users', index=False)
+                # Export with multiple sheets; an empty subset already carries the cleaned data
+                # columns, so its sheet is written with headers only
+                try:
+                    self.write_excel(file_path, {
+                        'Cleaned Data': df,
+                        'Resigned Users': resigned_users,
+                        'Current Users': current_users
+                    })
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+                    return
                 
                 messagebox.showinfo("Success", f"Data exported to:\n{file_path}\n\nSheets created:\n• Cleaned Data\n• Resigned Users\n• Current Users")
         else:  # csv - export main data only (CSV doesn't support multiple sheets)
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".csv",
-                initialfile=build_initial_filename(filename, "csv"),
+                initialfile=self.build_initial_filename(filename, "csv", timestamp),
                 filetypes=[("CSV files", "*.csv")]
             )
             if file_path:
-                df.to_csv(file_path, index=False)
+                try:
+                    df.to_csv(file_path, index=False)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Export failed:\n{str(e)}")
+                    return
                 messagebox.showinfo("Success", f"Data exported to:\n{file_path}\n\nNote: CSV format doesn't support multiple sheets. Only main data exported.")
     
     def get_resigned_users_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -1873,25 +2230,12 @@ class EmployeeCleanupTool:
         if df is None or df.empty:
             return pd.DataFrame()
         
-        # Filter for users with resignation dates (not null/empty)
-        resigned_mask = df['Resignation Date'].notna() & (df['Resignation Date'] != '') & (df['Resignation Date'] != 'None')
-        resigned_users = df[resigned_mask].copy()
-        
-        if resigned_users.empty:
-            return pd.DataFrame(columns=df.columns)
-        
-        # Sort by resignation date (most recent first)
-        try:
-            # Convert resignation dates to datetime for proper sorting
-            resigned_users['Resignation Date'] = pd.to_datetime(resigned_users['Resignation Date'], format='%m/%d/%Y', errors='coerce')
-            resigned_users = resigned_users.sort_values('Resignation Date', ascending=False)
-            
-            # Convert back to string format for display
-            resigned_users['Resignation Date'] = resigned_users['Resignation Date'].dt.strftime('%m/%d/%Y')
-        except:
-            # If date conversion fails, sort as strings
-            resigned_users = resigned_users.sort_values('Resignation Date', ascending=False)
+        cached = self.user_subsets.get('resigned')
+        if cached is not None and cached[0] is df:
+            return cached[1]
         
+        resigned_users = self.select_resigned_users(df)
+        self.user_subsets['resigned'] = (df, resigned_users)
         return resigned_users
     
     def get_current_users_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -1899,23 +2243,53 @@ class EmployeeCleanupTool:
         if df is None or df.empty:
             return pd.DataFrame()
         
-        # Filter for users without resignation dates (current employees)
-        current_mask = df['Resignation Date'].isna() | (df['Resignation Date'] == '') | (df['Resignation Date'] == 'None')
-        current_users = df[current_mask].copy()
+        cached = self.user_subsets.get('current')
+        if cached is not None and cached[0] is df:
+            return cached[1]
+        
+        current_users = self.select_current_users(df)
+        self.user_subsets['current'] = (df, current_users)
+        return current_users
+    
+    def resigned_mask(self, df: pd.DataFrame) -> pd.Series:
+        """Mask of rows with a resignation date (not null/empty)"""
+        resignation_dates = df['Resignation Date']
+        return resignation_dates.notna() & (resignation_dates != '') & (resignation_dates != 'None')
+    
+    def select_resigned_users(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Resigned users sorted by resignation date (most recent first)"""
+        # Filter for users with resignation dates (not null/empty); boolean indexing already
+        # returns a new frame, and assign below only replaces the date column
+        resigned_users = df[self.resigned_mask(df)]
+        
+        if resigned_users.empty:
+            return pd.DataFrame(columns=df.columns)
+        
+        # Sort by resignation date (most recent first). Cleanup already wrote every date as
+        # MM/DD/YYYY, so the format-locked parser applies; anything else (status values) becomes
+        # NaT and sorts last. errors='coerce' never raises, so no string-sort fallback is needed
+        parsed_dates = pd.to_datetime(resigned_users['Resignation Date'], format='%m/%d/%Y', errors='coerce')
+        resigned_users = resigned_users.assign(**{'Resignation Date': parsed_dates}).sort_values('Resignation Date', ascending=False)
+        
+        # Convert back to string format for display
+        resigned_users['Resignation Date'] = resigned_users['Resignation Date'].dt.strftime('%m/%d/%Y')
+        
+        return resigned_users
+    
+    def select_current_users(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Current users (without resignation date) sorted by PERNR"""
+        # Filter for users without resignation dates (current employees); as above, no extra copy
+        current_users = df[~self.resigned_mask(df)]
         
         if current_users.empty:
             return pd.DataFrame(columns=df.columns)
         
-        # Sort by PERNR for consistent ordering
-        try:
-            # Convert PERNR to numeric for proper sorting
-            current_users['PERNR'] = pd.to_numeric(current_users['PERNR'], errors='coerce')
-            current_users = current_users.sort_values('PERNR', ascending=True)
-            # Convert back to string for display
-            current_users['PERNR'] = current_users['PERNR'].astype(str)
-        except:
-            # If PERNR conversion fails, sort as strings
-            current_users = current_users.sort_values('PERNR', ascending=True)
+        # Sort by PERNR for consistent ordering, comparing numerically; the column itself keeps
+        # its original text, so PERNRs are not round-tripped through float ("1001" -> "1001.0")
+        # and non-numeric ones are not lost
+        current_users = current_users.sort_values(
+            'PERNR', ascending=True, key=lambda pernr: pd.to_numeric(pernr, errors='coerce')
+        )
         
         return current_users
     
@@ -1930,7 +2304,8 @@ class EmployeeCleanupTool:
         if not confirm:
             return
         
-        # Clear all uploaded files
+        # Clear all uploaded files (and drop results of parses still in progress)
+        self.pending_uploads.clear()
         for key in self.uploaded_files.keys():
             self.uploaded_files[key] = None
             self.file_paths[key] = None
@@ -1946,6 +2321,7 @@ class EmployeeCleanupTool:
         # Clear results data
         self.cleaned_data = None
         self.unmatched_data = None
+        self.user_subsets.clear()
         
         # Remove preview section
         if self.preview_frame:
@@ -2030,16 +2406,23 @@ class EmployeeCleanupTool:
         tree.heading("#0", text="Row")
         
         # Highlight key columns with wider width
-        key_columns = ['PERNR', 'Full Name (From Masterlist)', 'Resignation Date', 'Position Name', 'Segment Name', 'Group Name', 'Area/Division Name', 'Department/Branch']
         for col in columns:
-            width = 200 if col in key_columns else 150
+            width = 200 if col in self.KEY_COLUMNS else 150
             tree.column(col, width=width, minwidth=100)
             tree.heading(col, text=str(col), command=lambda c=col: self.sort_treeview(tree, c, False))
         
-        # Add data (first 100 rows for performance)
-        for idx, row in df.head(100).iterrows():
-            values = [str(val) if pd.notna(val) else "" for val in row]
-            tree.insert("", "end", text=str(idx + 1), values=values)
+        # Add data (first 100 rows for performance); cells are converted to text in one
+        # vectorized pass (empty for missing values), and rows are inserted before the tree
+        # is gridded so Tk lays the table out once
+        head = df.head(100)
+        cells = head.astype(object).astype(str).where(head.notna(), "")
+        
+        # Keep each row's cell text on the tree (item id -> values) so sorting does not have
+        # to read every cell back from Tk
+        tree.row_columns = columns
+        tree.row_cells = {}
+        for idx, values in zip(head.index, cells.to_numpy().tolist()):
+            tree.row_cells[tree.insert("", "end", text=str(idx + 1), values=values)] = values
         
         # Pack elements
         tree.grid(row=0, column=0, sticky="nsew")
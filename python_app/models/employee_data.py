@@ -166,10 +166,9 @@ class EmployeeDataset:
         if current_path and os.path.exists(current_path):
             try:
                 file_extension = Path(current_path).suffix.lower()
-                if file_extension == '.csv':
-                    self.masterlist_current = file_handler.detect_and_load_csv(current_path)
-                elif file_extension in ['.xlsx', '.xls']:
-                    self.masterlist_current = file_handler.detect_and_load_excel(current_path)
+                if file_extension in ['.csv', '.xlsx', '.xls']:
+                    # Reuses the cached parse when the file has not changed since last session
+                    self.masterlist_current = file_handler.load_with_cache(current_path)
                 files_loaded = True
             except Exception:
                 # If loading fails, remove the path
@@ -180,10 +179,9 @@ class EmployeeDataset:
         if resigned_path and os.path.exists(resigned_path):
             try:
                 file_extension = Path(resigned_path).suffix.lower()
-                if file_extension == '.csv':
-                    self.masterlist_resigned = file_handler.detect_and_load_csv(resigned_path)
-                elif file_extension in ['.xlsx', '.xls']:
-                    self.masterlist_resigned = file_handler.detect_and_load_excel(resigned_path)
+                if file_extension in ['.csv', '.xlsx', '.xls']:
+                    # Reuses the cached parse when the file has not changed since last session
+                    self.masterlist_resigned = file_handler.load_with_cache(resigned_path)
                 files_loaded = True
             except Exception:
                 # If loading fails, remove the path
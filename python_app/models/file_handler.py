@@ -3,78 +3,167 @@ File Handler Model
 Handles file I/O operations and data loading
 """
 
+import io
+import os
+import json
+import hashlib
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_string_dtype
 from pathlib import Path
 from typing import Optional, Tuple
 import re
 
+try:
+    # Optional Rust-backed writer (much faster for large exports)
+    from rustpy_xlsxwriter import FastExcel, Format
+except ImportError:
+    FastExcel = None
+
 
 class FileHandler:
     """Handles file I/O operations"""
     
+    # Cache directory for parsed files (keyed by source path, validated by mtime and size)
+    CACHE_DIR = Path(__file__).parent.parent / '.cache'
+    
+    # Version of the parsing logic baked into cached files; bump it whenever loading changes
+    # what a parsed DataFrame looks like, so parses made by older code are not reused
+    CACHE_VERSION = 1
+    
+    # Number of rows sampled for header detection and dtype inference
+    SAMPLE_ROWS = 1000
+    
+    # Buffer size for export writes (1 MiB)
+    WRITE_BUFFER_SIZE = 1 << 20
+    
+    # Excel number format for Resignation Date cells ('mm-dd-yy', openpyxl's FORMAT_DATE_XLSX14)
+    RESIGNATION_DATE_FORMAT = 'mm-dd-yy'
+    
+    # Placeholder cell values treated as missing at load time (on top of pandas' defaults),
+    # so downstream code can rely on notna()/isna() alone
+    NA_VALUES = ['', 'None', 'NONE', 'null', 'N/A']
+    
+    @staticmethod
+    def load_with_cache(file_path: str) -> pd.DataFrame:
+        """
+        Load a CSV/Excel file, reusing a previously parsed copy if the file is unchanged
+        (and was parsed by the current CACHE_VERSION)
+        
+        The parsed DataFrame is pickled rather than written as Parquet, because masterlist
+        columns often mix numbers and text (e.g. PERNR), which Parquet cannot store as-is.
+        
+        Args:
+            file_path: Path to the CSV/XLSX/XLS file
+            
+        Returns:
+            Parsed DataFrame
+        """
+        stat = os.stat(file_path)
+        cache_key = f"{FileHandler.CACHE_VERSION}-{stat.st_mtime_ns}-{stat.st_size}"
+        cache_name = hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()
+        cache_path = FileHandler.CACHE_DIR / f"{cache_name}.pkl"
+        meta_path = FileHandler.CACHE_DIR / f"{cache_name}.json"
+        
+        # Fast path: source file unchanged since it was cached
+        try:
+            with open(meta_path, 'r') as f:
+                if json.load(f).get('key') == cache_key:
+                    return pd.read_pickle(cache_path)
+        except Exception:
+            # Missing or unreadable cache, parse the source file instead
+            pass
+        
+        # Slow path: parse the source file
+        if Path(file_path).suffix.lower() == '.csv':
+            df = FileHandler.detect_and_load_csv(file_path)
+        else:
+            df = FileHandler.detect_and_load_excel(file_path)
+        
+        try:
+            FileHandler.CACHE_DIR.mkdir(exist_ok=True)
+            df.to_pickle(cache_path)
+            with open(meta_path, 'w') as f:
+                json.dump({'key': cache_key, 'source': str(file_path)}, f)
+        except Exception:
+            # If caching fails, continue without error
+            pass
+        
+        return df
+    
     @staticmethod
     def detect_and_load_csv(file_path: str) -> pd.DataFrame:
         """Detect header row and load CSV file by searching for 'Full Name'"""
-        # First try standard loading
+        # Read the file once; every parse below works from memory
+        data = FileHandler._read_file_bytes(file_path)
+        
+        # Detect the header row on a sample instead of parsing the whole file per attempt
+        header_row = FileHandler._detect_header_row(
+            lambda header: pd.read_csv(io.BytesIO(data), header=header, nrows=FileHandler.SAMPLE_ROWS,
+                                       na_values=FileHandler.NA_VALUES)
+        )
+        
+        # Pin text columns to the dtype inferred from the sample, so the full parse
+        # does not retry numeric conversion on them
         try:
-            df = pd.read_csv(file_path)
-            if 'Full Name' in df.columns:
-                return df
-        except:
-            pass
+            sample = pd.read_csv(io.BytesIO(data), header=header_row, nrows=FileHandler.SAMPLE_ROWS,
+                                 na_values=FileHandler.NA_VALUES)
+            dtype_hints = {col: dtype for col, dtype in sample.dtypes.items() if is_string_dtype(dtype)}
+            return pd.read_csv(io.BytesIO(data), header=header_row, dtype=dtype_hints,
+                               na_values=FileHandler.NA_VALUES)
+        except Exception:
+            # Let pandas infer everything if the hints do not fit the full file
+            return pd.read_csv(io.BytesIO(data), header=header_row, na_values=FileHandler.NA_VALUES)
+    
+    @staticmethod
+    def _detect_header_row(read_with_header) -> int:
+        """
+        Find the header row by searching for 'Full Name', then for expected keywords
         
+        Args:
+            read_with_header: Callable taking a header row index and returning a DataFrame
+            
+        Returns:
+            Index of the detected header row (0 if none matched)
+        """
         # Search for 'Full Name' in the first 10 rows
-        for header_row in range(10):  # Check first 10 rows
+        for header_row in range(10):
             try:
-                df = pd.read_csv(file_path, header=header_row)
-                if 'Full Name' in df.columns:
-                    return df
+                if 'Full Name' in read_with_header(header_row).columns:
+                    return header_row
             except:
                 continue
         
         # If 'Full Name' not found, try keyword detection
         for header_row in range(10):
             try:
-                df = pd.read_csv(file_path, header=header_row)
-                if FileHandler._is_valid_header(df.columns):
-                    return df
+                if FileHandler._is_valid_header(read_with_header(header_row).columns):
+                    return header_row
             except:
                 continue
         
         # Fallback to first row
-        return pd.read_csv(file_path)
+        return 0
     
     @staticmethod
     def detect_and_load_excel(file_path: str) -> pd.DataFrame:
         """Detect header row and load Excel file by searching for 'Full Name'"""
-        # First try standard loading
-        try:
-            df = pd.read_excel(file_path)
-            if 'Full Name' in df.columns:
-                return df
-        except:
-            pass
-        
-        # Search for 'Full Name' in the first 10 rows
-        for header_row in range(10):  # Check first 10 rows
-            try:
-                df = pd.read_excel(file_path, header=header_row)
-                if 'Full Name' in df.columns:
-                    return df
-            except:
-                continue
+        # Read the file once; every parse below works from memory
+        data = FileHandler._read_file_bytes(file_path)
         
-        # If 'Full Name' not found, try keyword detection
-        for header_row in range(10):
-            try:
-                df = pd.read_excel(file_path, header=header_row)
-                if FileHandler._is_valid_header(df.columns):
-                    return df
-            except:
-                continue
+        header_row = FileHandler._detect_header_row(
+            lambda header: pd.read_excel(io.BytesIO(data), header=header, nrows=FileHandler.SAMPLE_ROWS)
+        )
+        df = pd.read_excel(io.BytesIO(data), header=header_row)
         
-        # Fallback to first row
-        return pd.read_excel(file_path)
+        # read_excel has no na_values equivalent for text cells like "None", so replace them here
+        return df.replace(FileHandler.NA_VALUES, np.nan)
+    
+    @staticmethod
+    def _read_file_bytes(file_path: str) -> bytes:
+        """Read a whole file in a single sequential read"""
+        with open(file_path, 'rb') as f:
+            return f.read()
     
     @staticmethod
     def _is_valid_header(columns) -> bool:
@@ -98,29 +187,105 @@ class FileHandler:
     
     @staticmethod
     def export_to_excel(df: pd.DataFrame, file_path: str, multi_sheet_data: Optional[dict] = None):
-        """Export DataFrame to Excel with optional multi-sheet support and date formatting"""
-        if multi_sheet_data:
-            # Export with multiple sheets
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                for sheet_name, sheet_df in multi_sheet_data.items():
-                    if sheet_df is not None and not sheet_df.empty:
-                        sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
-                        
-                        # Apply date formatting to Resignation Date column if it exists
-                        if 'Resignation Date' in sheet_df.columns:
-                            FileHandler._format_resignation_date_column(writer, sheet_name, sheet_df)
-                    else:
-                        # Create empty sheet with headers if no data
-                        empty_df = pd.DataFrame(columns=df.columns if df is not None else [])
-                        empty_df.to_excel(writer, sheet_name=sheet_name, index=False)
-        else:
-            # Single sheet export
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Sheet1', index=False)
+        """
+        Export DataFrame to Excel with optional multi-sheet support and date formatting
+        
+        Args:
+            df: Main DataFrame (also supplies the headers for empty sheets)
+            file_path: Destination .xlsx path
+            multi_sheet_data: Optional mapping of sheet name to a DataFrame, or to a
+                zero-argument callable returning one. Callables are only evaluated when
+                their sheet is written, so derived sheets are never all held at once.
+        """
+        if FastExcel is not None:
+            FileHandler._export_to_excel_fast(df, file_path, multi_sheet_data)
+            return
+        
+        with open(file_path, 'wb', buffering=FileHandler.WRITE_BUFFER_SIZE) as fh, \
+                pd.ExcelWriter(fh, engine='openpyxl') as writer:
+            for sheet_name, sheet_df in FileHandler._iter_sheets(df, multi_sheet_data):
+                sheet_df.to_excel(writer, sheet_name=sheet_name, index=False)
                 
                 # Apply date formatting to Resignation Date column if it exists
-                if 'Resignation Date' in df.columns:
-                    FileHandler._format_resignation_date_column(writer, 'Sheet1', df)
+                if not sheet_df.empty and 'Resignation Date' in sheet_df.columns:
+                    FileHandler._format_resignation_date_column(writer, sheet_name, sheet_df)
+                
+                # Release the sheet before the next one is built
+                del sheet_df
+    
+    @staticmethod
+    def _export_to_excel_fast(df: pd.DataFrame, file_path: str, multi_sheet_data: Optional[dict] = None):
+        """
+        Export DataFrame(s) to Excel using the Rust-backed FastExcel writer
+        
+        Produces the same cells as the openpyxl path: datetimes use pandas' default
+        format, and MM/DD/YYYY Resignation Dates are written as Excel dates (status
+        values like "ACTIVE" stay text).
+        """
+        writer = FastExcel(file_path).format(datetime_format='yyyy-mm-dd hh:mm:ss')
+        date_format = {'Resignation Date': Format().set_num_format(FileHandler.RESIGNATION_DATE_FORMAT)}
+        for sheet_name, sheet_df in FileHandler._iter_sheets(df, multi_sheet_data):
+            sheet_df = FileHandler._prepare_fast_sheet(sheet_df)
+            if 'Resignation Date' in sheet_df.columns:
+                writer.sheet(sheet_name, sheet_df, column_formats=date_format)
+            else:
+                writer.sheet(sheet_name, sheet_df)
+        writer.save()
+    
+    @staticmethod
+    def _prepare_fast_sheet(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adapt a sheet's values to what FastExcel can write
+        
+        FastExcel cannot write NaT (it fails on year 1), so datetime columns with
+        missing values are handed over as objects with None. MM/DD/YYYY Resignation
+        Dates are parsed into datetimes, matching _format_resignation_date_column.
+        The input frame is never modified.
+        """
+        prepared = df
+        for col in df.columns.unique():
+            values = df[col]
+            if isinstance(values, pd.DataFrame):
+                # Duplicate column names; leave them as they are
+                continue
+            if col == 'Resignation Date':
+                excel_dates = {value: FileHandler._parse_resignation_date(value) for value in values.dropna().unique()}
+                values = values.map(excel_dates)
+            elif not is_datetime64_any_dtype(values) or values.notna().all():
+                continue
+            if prepared is df:
+                prepared = df.copy(deep=False)
+            prepared[col] = values.astype(object).where(values.notna(), None)
+        
+        # FastExcel only takes text headers (Excel headers can be numbers, e.g. a year)
+        if not all(isinstance(col, str) for col in prepared.columns):
+            prepared = prepared.set_axis([str(col) for col in prepared.columns], axis=1)
+        return prepared
+    
+    @staticmethod
+    def _parse_resignation_date(value):
+        """MM/DD/YYYY text as a datetime; any other value is returned unchanged"""
+        from datetime import datetime
+        
+        try:
+            return datetime.strptime(str(value), '%m/%d/%Y')
+        except (ValueError, TypeError):
+            return value
+    
+    @staticmethod
+    def _iter_sheets(df: pd.DataFrame, multi_sheet_data: Optional[dict] = None):
+        """Yield (sheet name, DataFrame) pairs, building lazy sheets one at a time"""
+        if not multi_sheet_data:
+            yield 'Sheet1', df
+            return
+        
+        for sheet_name, sheet_df in multi_sheet_data.items():
+            if callable(sheet_df):
+                sheet_df = sheet_df()
+            if sheet_df is None or sheet_df.empty:
+                # Create empty sheet with headers if no data
+                sheet_df = pd.DataFrame(columns=df.columns if df is not None else [])
+            yield sheet_name, sheet_df
     
     @staticmethod
     def _format_resignation_date_column(writer, sheet_name: str, df: pd.DataFrame):
@@ -159,7 +324,9 @@ class FileHandler:
     @staticmethod
     def export_to_csv(df: pd.DataFrame, file_path: str):
         """Export DataFrame to CSV"""
-        df.to_csv(file_path, index=False)
+        # Large write buffer to avoid many small write() calls on slow/network drives
+        with open(file_path, 'w', buffering=FileHandler.WRITE_BUFFER_SIZE, newline='', encoding='utf-8') as fh:
+            df.to_csv(fh, index=False)
     
     @staticmethod
     def build_filename(base_name: str, label: str, timestamp: str, extension: str) -> str:
@@ -170,21 +337,8 @@ class FileHandler:
         return f"{sanitized_base} - {formatted_label} - {timestamp}.{extension}"
     
     @staticmethod
-    def get_file_info(file_path: str) -> Tuple[str, str, int, int]:
-        """Get file information (name, extension, rows, columns)"""
+    def get_file_info(file_path: str, df: pd.DataFrame) -> Tuple[str, str, int, int]:
+        """Get file information (name, extension, rows, columns) for a file already loaded as df"""
         path_obj = Path(file_path)
-        file_name = path_obj.name
-        extension = path_obj.suffix.lower()
-        
-        # Try to get row and column count
-        try:
-            if extension == '.csv':
-                df = pd.read_csv(file_path)
-            elif extension in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path)
-            else:
-                return file_name, extension, 0, 0
-            
-            return file_name, extension, len(df), len(df.columns)
-        except:
-            return file_name, extension, 0, 0
+        row_count, col_count = df.shape
+        return path_obj.name, path_obj.suffix.lower(), row_count, col_count
@@ -3,15 +3,74 @@ Matching Engine Model
 Handles employee matching logic including fuzzy matching and data sorting
 """
 
-from typing import Optional, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
 from .data_sorter import DataSorter
 
+try:
+    # Optional Arrow backend for pandas string columns
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class _NameParts:
+    """Cleaned names split into parts, with the derived strings used for name order scoring"""
+    
+    def __init__(self, names: list):
+        self.names = names
+        self.parts = [name.split() for name in names]
+        self.part_counts = np.array([len(parts) for parts in self.parts], dtype=np.int64)
+        self.joined = [" ".join(parts) for parts in self.parts]
+        self.reversed = [f"{parts[-1]}, {parts[0]}" if parts else "" for parts in self.parts]
+        
+        # Distinct name parts, and the parts of every name as ids into them
+        vocabulary_index = {}
+        for parts in self.parts:
+            for part in parts:
+                vocabulary_index.setdefault(part, len(vocabulary_index))
+        self.vocabulary = list(vocabulary_index)
+        self.vocabulary_lengths = np.array([len(part) for part in self.vocabulary], dtype=np.int64)
+        self.part_ids = [[vocabulary_index[part] for part in parts] for parts in self.parts]
+    
+    def rotated(self, position: int, split: int) -> str:
+        """Name as "Last, First" when split after the given number of parts"""
+        parts = self.parts[position]
+        return f"{' '.join(parts[split:])}, {' '.join(parts[:split])}"
+    
+    def flat_part_ids(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vocabulary ids of the parts of the given names, concatenated, with each name's start offset"""
+        ids = [self.part_ids[position] for position in positions]
+        offsets = np.cumsum([0] + [len(part_ids) for part_ids in ids[:-1]])
+        return np.fromiter((i for part_ids in ids for i in part_ids), dtype=np.int64), offsets
+
 
 class MatchingEngine:
     """Handles employee matching logic and data sorting"""
     
+    # Placeholder values (lowercase) that mean no PERNR was recorded
+    INVALID_PERNR_SET = frozenset({
+        'cant find', 'can\'t find', 'cannot find', 'not found', 'unknown',
+        'n/a', 'na', 'null', 'none', 'empty', 'missing', 'error',
+        'invalid', 'invalid pernr', 'no match', 'no data'
+    })
+    
+    # String dtype for vectorized name/PERNR cleanup; Arrow-backed strings run
+    # str.strip/str.lower/isin as compiled kernels instead of per-object calls
+    STRING_DTYPE = 'string[pyarrow]' if pyarrow is not None else 'string'
+    
+    # Number of masterlist names and of unmatched names scored at a time; together they bound
+    # the size of the score matrices (QUERY_BLOCK_SIZE x SCORE_BLOCK_SIZE per scoring thread)
+    SCORE_BLOCK_SIZE = 2000
+    QUERY_BLOCK_SIZE = 250
+    
+    # Minimum number of names per scoring thread (smaller batches aren't worth a thread)
+    MIN_PARTITION_SIZE = 100
+    
     def __init__(self, use_fuzzy_logic: bool = True, threshold: int = 80):
         self.use_fuzzy_logic = use_fuzzy_logic
         self.threshold = threshold
@@ -37,15 +96,8 @@ class MatchingEngine:
         if not pernr_str:
             return False
         
-        # Check for invalid PERNR indicators
-        invalid_indicators = [
-            'cant find', 'can\'t find', 'cannot find', 'not found', 'unknown',
-            'n/a', 'na', 'null', 'none', 'empty', 'missing', 'error',
-            'invalid', 'invalid pernr', 'no match', 'no data'
-        ]
-        
-        # Case-insensitive check for invalid indicators
-        if pernr_str.lower() in [indicator.lower() for indicator in invalid_indicators]:
+        # Case-insensitive check for invalid PERNR indicators
+        if pernr_str.lower() in self.INVALID_PERNR_SET:
             return False
         
         # If it has any content and is not an invalid indicator, consider it valid
@@ -85,16 +137,86 @@ class MatchingEngine:
         Returns:
             Tuple of (employee_number, full_name, match_type, match_score) or (None, None, "no_match", 0.0) if not found
         """
-        if masterlist_df is None or masterlist_df.empty:
-            return None, None, "no_match", 0.0
+        return self.find_employees_by_name([current_name], masterlist_df)[0]
+    
+    def find_employees_by_name(self, current_names: list, masterlist_df: pd.DataFrame,
+                               progress_callback: Optional[Callable[[int, int], bool]] = None) -> List[Tuple[Optional[str], Optional[str], str, float]]:
+        """
+        Find employees for a batch of names, scoring all of them against the masterlist at once
+        
+        Args:
+            current_names: Names from current system report (Username/Full Name)
+            masterlist_df: Masterlist dataframe (current or resigned)
+            progress_callback: Called with (names scored, names to score) as fuzzy matching
+                progresses; returning False stops the matching, leaving the unscored names unmatched
+            
+        Returns:
+            List with one (employee_number, full_name, match_type, match_score) tuple per name,
+            (None, None, "no_match", 0.0) where no employee was found
+        """
+        results = [(None, None, "no_match", 0.0)] * len(current_names)
+        if masterlist_df is None or masterlist_df.empty or not current_names:
+            return results
+        
+        name_col, emp_num_col = self._detect_masterlist_columns(masterlist_df)
+        if name_col is None or emp_num_col is None:
+            return results
+        
+        # Only rows with a name can match
+        has_name = masterlist_df[name_col].notna()
+        names = masterlist_df.loc[has_name, name_col].astype(self.STRING_DTYPE)
+        names_stripped = names.str.strip()
+        masterlist_names = names.tolist()
+        masterlist_names_stripped = names_stripped.tolist()
+        masterlist_names_clean = names_stripped.str.lower().tolist()
+        
+        # Convert PERNR to integer, return as string for consistency
+        emp_nums = pd.to_numeric(masterlist_df.loc[has_name, emp_num_col], errors='coerce')
+        emp_num_strs = [str(int(emp_num)) if pd.notna(emp_num) else None for emp_num in emp_nums]
+        
+        # Clean the current names for comparison
+        current_names_clean = pd.Series(current_names, dtype=object).astype(self.STRING_DTYPE).str.strip().str.lower().tolist()
+        
+        # PRIORITY 1: Try exact match first (case-insensitive)
+        # This ensures we get the most accurate Employee Number when names match exactly;
+        # the first masterlist row wins for duplicate names
+        exact_positions = {}
+        for position, name in enumerate(masterlist_names_clean):
+            exact_positions.setdefault(name, position)
+        
+        fuzzy_queries = []
+        for i, name in enumerate(current_names_clean):
+            position = exact_positions.get(name)
+            if position is not None:
+                results[i] = (emp_num_strs[position], masterlist_names[position], "exact_match", 100.0)
+            else:
+                fuzzy_queries.append(i)
+        
+        # PRIORITY 2: If no exact match, try fuzzy matching as fallback (if enabled)
+        # Only use fuzzy logic when exact matching fails AND fuzzy logic is enabled
+        if not self.use_fuzzy_logic or not fuzzy_queries:
+            return results
+        
+        # The same person often appears on several rows, so each distinct name is scored once
+        unique_queries = list(dict.fromkeys(current_names_clean[i] for i in fuzzy_queries))
+        best_scores, best_positions = self._best_fuzzy_matches(unique_queries, masterlist_names_clean, progress_callback)
+        best_matches = dict(zip(unique_queries, zip(best_scores, best_positions)))
         
+        for i in fuzzy_queries:
+            best_score, position = best_matches[current_names_clean[i]]
+            # The best-scoring row (first one on ties) must reach the threshold and have a numeric PERNR
+            if position >= 0 and best_score >= self.threshold and emp_num_strs[position] is not None:
+                results[i] = (emp_num_strs[position], masterlist_names_stripped[position], "fuzzy_match", int(best_score))
+        
+        return results
+    
+    def _detect_masterlist_columns(self, masterlist_df: pd.DataFrame) -> Tuple[Optional[str], Optional[str]]:
+        """Find the name and PERNR columns of a masterlist"""
         # Find name columns in masterlist - prioritize "Full Name" column
         name_columns = [col for col in masterlist_df.columns if col == 'Full Name']
         if not name_columns:
             # Fallback to flexible matching (could be "Name", "Employee Name", etc.)
             name_columns = [col for col in masterlist_df.columns if 'name' in str(col).lower()]
-        if not name_columns:
-            return None, None, "no_match", 0.0
         
         # Find PERNR column - prioritize "PERNR" then "Pers. Number"
         emp_num_columns = [col for col in masterlist_df.columns if str(col).upper() == 'PERNR']
@@ -104,140 +226,158 @@ class MatchingEngine:
         if not emp_num_columns:
             # Fallback to old naming convention
             emp_num_columns = [col for col in masterlist_df.columns if 'employee' in str(col).lower() and 'number' in str(col).lower()]
-        if not emp_num_columns:
-            return None, None, "no_match", 0.0
         
-        name_col = name_columns[0]  # Use first name column found
-        emp_num_col = emp_num_columns[0]  # Use first PERNR column found
+        name_col = name_columns[0] if name_columns else None  # Use first name column found
+        emp_num_col = emp_num_columns[0] if emp_num_columns else None  # Use first PERNR column found
+        return name_col, emp_num_col
+    
+    def _best_fuzzy_matches(self, queries: list, choices: list,
+                            progress_callback: Optional[Callable[[int, int], bool]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every query against every choice and pick the best choice per query
         
-        best_match = None
-        best_score = 0
-        best_employee_number = None
-        best_full_name = None
+        The score of a pair is the highest of its ratio, partial ratio and name order score.
+        The queries are split into blocks of at most QUERY_BLOCK_SIZE scored in parallel
+        (RapidFuzz releases the GIL while computing, so the threads run on separate cores),
+        and each block is scored against SCORE_BLOCK_SIZE choices at a time, so the score
+        matrices have a fixed size however many names there are. Scores stay float64: asking
+        RapidFuzz for uint8 rounds halves up and float32 turns 57.4999... into 57.5, either of
+        which would change results next to the threshold.
         
-        # Clean the current name for comparison
-        current_name_clean = str(current_name).strip().lower()
+        Args:
+            queries: Cleaned (stripped, lowercase) names to match
+            choices: Cleaned masterlist names
+            progress_callback: Called with (queries scored, total queries) after every query
+                block; returning False cancels the blocks not scored yet
+            
+        Returns:
+            Tuple of (best score, best choice position) arrays; the position is -1 if there are no
+            choices or the query was not scored
+        """
+        # Split the masterlist names into blocks once; every query block scores against the same blocks
+        choice_blocks = [(start, _NameParts(choices[start:start + self.SCORE_BLOCK_SIZE]))
+                         for start in range(0, len(choices), self.SCORE_BLOCK_SIZE)]
         
-        # PRIORITY 1: Try exact match first (case-insensitive)
-        # This ensures we get the most accurate Employee Number when names match exactly
-        for idx, row in masterlist_df.iterrows():
-            masterlist_name = str(row[name_col]).strip().lower()
-            if pd.notna(row[name_col]) and current_name_clean == masterlist_name:
-                # Convert PERNR to integer, return as string for consistency
-                emp_num = pd.to_numeric(row[emp_num_col], errors='coerce')
-                return str(int(emp_num)) if pd.notna(emp_num) else None, str(row[name_col]), "exact_match", 100.0
+        # At least one query block per thread, none larger than QUERY_BLOCK_SIZE
+        workers = max(1, min(os.cpu_count() or 1, len(queries) // self.MIN_PARTITION_SIZE))
+        block_count = max(workers, -(-len(queries) // self.QUERY_BLOCK_SIZE))
+        bounds = np.linspace(0, len(queries), block_count + 1).astype(int)
         
-        # PRIORITY 2: If no exact match, try fuzzy matching as fallback (if enabled)
-        # Only use fuzzy logic when exact matching fails AND fuzzy logic is enabled
-        if not self.use_fuzzy_logic:
-            return None, None, "no_match", 0.0
-            
-        for idx, row in masterlist_df.iterrows():
-            if pd.isna(row[name_col]):
-                continue
-                
-            masterlist_name = str(row[name_col]).strip()
-            masterlist_name_clean = masterlist_name.lower()
+        best_scores = np.zeros(len(queries))
+        best_positions = np.full(len(queries), -1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._score_query_block, queries[start:stop], choice_blocks)
+                       for start, stop in zip(bounds[:-1], bounds[1:])]
             
-            # Calculate similarity score
-            score = fuzz.ratio(current_name_clean, masterlist_name_clean)
+            # Collect the blocks in order, reporting progress from the calling thread
+            for start, stop, future in zip(bounds[:-1], bounds[1:], futures):
+                best_scores[start:stop], best_positions[start:stop] = future.result()
+                if progress_callback is not None and not progress_callback(int(stop), len(queries)):
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        
+        return best_scores, best_positions
+    
+    def _score_query_block(self, queries: list, choice_blocks: list) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the best choice for each query of one block of at most QUERY_BLOCK_SIZE queries"""
+        best_scores = np.zeros(len(queries))
+        best_positions = np.full(len(queries), -1)
+        query_parts = _NameParts(queries)
+        
+        # Scores that cannot round up to the threshold are cut off inside RapidFuzz (returned
+        # as 0); only a best score at or above the threshold is ever used
+        score_cutoff = max(self.threshold - 0.5, 0)
+        
+        for start, block_parts in choice_blocks:
+            block = block_parts.names
             
-            # Also try partial ratio for better matching
-            partial_score = fuzz.partial_ratio(current_name_clean, masterlist_name_clean)
+            # Similarity scores, rounded in place to whole percentages (names are already cleaned)
+            scores = process.cdist(queries, block, scorer=fuzz.ratio, processor=None, dtype=np.float64,
+                                   score_cutoff=score_cutoff)
+            np.rint(scores, out=scores)
+            partial_scores = process.cdist(queries, block, scorer=fuzz.partial_ratio, processor=None,
+                                           dtype=np.float64, score_cutoff=score_cutoff)
+            np.maximum(scores, np.rint(partial_scores, out=partial_scores), out=scores)
+            del partial_scores
             
             # Try name order reversal matching (e.g., "Jared Ranjo" vs "Ranjo, Jared")
-            name_order_score = self._calculate_name_order_score(current_name_clean, masterlist_name_clean)
-            
-            # Use the highest score from all methods
-            final_score = max(score, partial_score, name_order_score)
+            np.maximum(scores, self._name_order_scores(query_parts, block_parts), out=scores)
             
-            # Update best match if this is better
-            if final_score > best_score and final_score >= self.threshold:
-                best_score = final_score
-                best_match = masterlist_name
-                # Convert PERNR to integer, store as string for consistency
-                emp_num = pd.to_numeric(row[emp_num_col], errors='coerce')
-                best_employee_number = str(int(emp_num)) if pd.notna(emp_num) else None
-                best_full_name = masterlist_name
-        
-        if best_employee_number is not None:
-            return best_employee_number, best_full_name, "fuzzy_match", best_score
-        else:
-            return None, None, "no_match", 0.0
+            # Update best match only if this block has a strictly better score (earlier rows win ties)
+            block_positions = scores.argmax(axis=1)
+            block_scores = scores[np.arange(len(queries)), block_positions]
+            better = block_scores > best_scores
+            best_scores[better] = block_scores[better]
+            best_positions[better] = block_positions[better] + start
+        
+        return best_scores, best_positions
     
-    def _calculate_name_order_score(self, name1: str, name2: str) -> float:
+    def _name_order_scores(self, names1: '_NameParts', names2: '_NameParts') -> np.ndarray:
         """
-        Calculate similarity score for name order variations
+        Calculate similarity scores for name order variations for every pair of names
         Handles cases like "Jared Ranjo" vs "Ranjo, Jared"
         """
-        # Split names into parts
-        name1_parts = [part.strip() for part in name1.split() if part.strip()]
-        name2_parts = [part.strip() for part in name2.split() if part.strip()]
+        def ratios(left, right):
+            scores = process.cdist(left, right, scorer=fuzz.ratio, dtype=np.float64)
+            return np.rint(scores, out=scores)
         
-        # If either name has less than 2 parts, use regular fuzzy matching
-        if len(name1_parts) < 2 or len(name2_parts) < 2:
-            return 0.0
+        counts1 = names1.part_counts[:, None]
+        counts2 = names2.part_counts[None, :]
+        scores = np.zeros((len(names1.names), len(names2.names)))
         
-        # Try different name order combinations
-        best_score = 0.0
+        # If either name has less than 2 parts, use regular fuzzy matching
+        rows = np.flatnonzero(names1.part_counts >= 2)
+        cols = np.flatnonzero(names2.part_counts >= 2)
+        if not len(rows) or not len(cols):
+            return scores
+        both = np.ix_(rows, cols)
         
-        # Method 1: Try reversed order (First Last vs Last, First)
-        if len(name1_parts) >= 2 and len(name2_parts) >= 2:
-            # Try "First Last" vs "Last, First"
-            name1_reversed = f"{name1_parts[-1]}, {name1_parts[0]}"  # "Ranjo, Jared"
-            name2_reversed = f"{name2_parts[-1]}, {name2_parts[0]}"  # "Ranjo, Jared"
-            
-            # Compare original with reversed
-            score1 = fuzz.ratio(name1, name2_reversed)
-            score2 = fuzz.ratio(name1_reversed, name2)
-            best_score = max(best_score, score1, score2)
+        # Method 1: Try reversed order ("First Last" vs "Last, First")
+        scores[both] = np.maximum(
+            ratios([names1.names[r] for r in rows], [names2.reversed[c] for c in cols]),
+            ratios([names1.reversed[r] for r in rows], [names2.names[c] for c in cols])
+        )
         
         # Method 2: Try different combinations for names with 3+ parts
-        if len(name1_parts) >= 3 or len(name2_parts) >= 3:
-            # For names like "John Michael Smith" vs "Smith, John Michael"
-            # Try different combinations
-            for i in range(1, min(len(name1_parts), len(name2_parts))):
-                # Try splitting at different points
-                name1_first = " ".join(name1_parts[:i])
-                name1_last = " ".join(name1_parts[i:])
-                name2_first = " ".join(name2_parts[:i])
-                name2_last = " ".join(name2_parts[i:])
-                
-                # Compare "First Last" vs "Last, First"
-                combo1 = f"{name1_first} {name1_last}"
-                combo2 = f"{name2_last}, {name2_first}"
-                score = fuzz.ratio(combo1, combo2)
-                best_score = max(best_score, score)
-                
-                # Also try the reverse
-                combo3 = f"{name1_last}, {name1_first}"
-                combo4 = f"{name2_first} {name2_last}"
-                score = fuzz.ratio(combo3, combo4)
-                best_score = max(best_score, score)
+        # (e.g. "John Michael Smith" vs "Smith, John Michael"), splitting at every point
+        # both names have; "first last" with a single space is just the rejoined name
+        three_plus = (counts1 >= 3) | (counts2 >= 3)
+        for split in range(1, min(names1.part_counts.max(), names2.part_counts.max())):
+            split_rows = np.flatnonzero(names1.part_counts > split)
+            split_cols = np.flatnonzero(names2.part_counts > split)
+            pair = np.ix_(split_rows, split_cols)
+            split_scores = np.maximum(
+                ratios([names1.joined[r] for r in split_rows], [names2.rotated(c, split) for c in split_cols]),
+                ratios([names1.rotated(r, split) for r in split_rows], [names2.joined[c] for c in split_cols])
+            )
+            scores[pair] = np.where(three_plus[pair], np.maximum(scores[pair], split_scores), scores[pair])
         
         # Method 3: Try partial matching for name components
         # This helps with cases like "Jared Ranjo" vs "Ranjo, Jared Michael"
-        for part1 in name1_parts:
-            for part2 in name2_parts:
-                if len(part1) >= 3 and len(part2) >= 3:  # Only for substantial name parts
-                    partial_score = fuzz.ratio(part1, part2)
-                    if partial_score >= 80:  # High similarity for name parts
-                        # Calculate overall score based on matching parts
-                        matching_parts = 0
-                        total_parts = max(len(name1_parts), len(name2_parts))
-                        
-                        for p1 in name1_parts:
-                            for p2 in name2_parts:
-                                if fuzz.ratio(p1, p2) >= 80:
-                                    matching_parts += 1
-                                    break
-                        
-                        if matching_parts >= 2:  # At least 2 parts match
-                            component_score = (matching_parts / total_parts) * 100
-                            best_score = max(best_score, component_score)
-        
-        return best_score
-
+        part_matches = ratios(names1.vocabulary, names2.vocabulary) >= 80  # High similarity for name parts
+        substantial = (names1.vocabulary_lengths[:, None] >= 3) & (names2.vocabulary_lengths[None, :] >= 3)
+        ids1, offsets1 = names1.flat_part_ids(rows)
+        ids2, offsets2 = names2.flat_part_ids(cols)
+        
+        # Whether each names1 vocabulary part matches any part of each names2 name
+        matches_any = np.logical_or.reduceat(part_matches[:, ids2], offsets2, axis=1)
+        matches_substantial = np.logical_or.reduceat((part_matches & substantial)[:, ids2], offsets2, axis=1)
+        
+        # Number of parts in names1 that match some part of names2, and whether any pair of
+        # substantial parts matched (which is what enables the component score)
+        matching_parts = np.add.reduceat(matches_any[ids1].astype(np.int64), offsets1, axis=0)
+        enabled = np.logical_or.reduceat(matches_substantial[ids1], offsets1, axis=0)
+        total_parts = np.maximum(names1.part_counts[rows][:, None], names2.part_counts[cols][None, :])
+        component_scores = np.where(
+            enabled & (matching_parts >= 2),  # At least 2 parts match
+            matching_parts / total_parts * 100,
+            0.0
+        )
+        scores[both] = np.maximum(scores[both], component_scores)
+        
+        return scores
+    
     def _find_column(self, df: pd.DataFrame, keywords: list) -> Optional[str]:
         """Find column by keywords with flexible matching"""
         # Try exact match first
@@ -255,9 +395,9 @@ class MatchingEngine:
         # Check exact match first
         exact_match = name1_clean == name2_clean
         
-        # Calculate similarity scores
-        score = fuzz.ratio(name1_clean, name2_clean)
-        partial_score = fuzz.partial_ratio(name1_clean, name2_clean)
+        # Calculate similarity scores (rounded to whole percentages, as in the batch matching)
+        score = round(fuzz.ratio(name1_clean, name2_clean))
+        partial_score = round(fuzz.partial_ratio(name1_clean, name2_clean))
         final_score = max(score, partial_score)
         
         # Check if it would match (only if fuzzy logic is enabled)
@@ -394,19 +394,18 @@ class ResultsView:
         if cleaned_data is None or cleaned_data.empty:
             return None
         
-        resigned_mask = cleaned_data['Resignation Date'].notna() & (cleaned_data['Resignation Date'] != '') & (cleaned_data['Resignation Date'] != 'None')
-        resigned_users = cleaned_data[resigned_mask].copy()
+        resigned_mask = cleaned_data['Resignation Date'].notna()
+        resigned_users = cleaned_data[resigned_mask]
         
         if resigned_users.empty:
             return None
         
-        # Sort by resignation date (most recent first)
-        try:
-            resigned_users['Resignation Date'] = pd.to_datetime(resigned_users['Resignation Date'], format='%m/%d/%Y', errors='coerce')
-            resigned_users = resigned_users.sort_values('Resignation Date', ascending=False)
-            resigned_users['Resignation Date'] = resigned_users['Resignation Date'].dt.strftime('%m/%d/%Y')
-        except:
-            resigned_users = resigned_users.sort_values('Resignation Date', ascending=False)
+        # Sort by resignation date (most recent first). Dates are parsed into a temporary
+        # sort key, so the column keeps its MM/DD/YYYY strings (and status values like
+        # "ACTIVE") without a strftime round-trip
+        parsed_dates = pd.to_datetime(resigned_users['Resignation Date'], format='%m/%d/%Y', errors='coerce')
+        resigned_users = resigned_users.assign(_sort_key=parsed_dates)
+        resigned_users = resigned_users.sort_values('_sort_key', ascending=False).drop(columns='_sort_key')
         
         return resigned_users
     
@@ -416,7 +415,7 @@ class ResultsView:
         if cleaned_data is None or cleaned_data.empty:
             return None
         
-        current_mask = cleaned_data['Resignation Date'].isna() | (cleaned_data['Resignation Date'] == '') | (cleaned_data['Resignation Date'] == 'None')
+        current_mask = cleaned_data['Resignation Date'].isna()
         current_users = cleaned_data[current_mask].copy()
         
         if current_users.empty: